@@ -1,22 +1,84 @@
+import copy
+import csv
+import hashlib
+import itertools
 import logging
+import sys
+import threading
+import time
+import traceback
+from datetime import timedelta
 from functools import wraps
 
+from django import forms
 from django import http
 from django.conf import settings
-
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.servers.basehttp import FileWrapper
+from django.core.urlresolvers import Resolver404, resolve
+from django.db import connection, connections
+from django.forms.models import model_to_dict
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils import six
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.datastructures import SortedDict
+from django.utils.dateparse import parse_datetime
+
+from djsonapi import events
+from djsonapi import jobs
+from djsonapi import profiling
+from djsonapi import routers
 from djsonapi import serial
+from djsonapi.models import Tombstone, model_label
 
 log = logging.getLogger("djsonapi")
 
 FORM_METHOD_TYPES = ["POST", "PUT", "PATCH"]
 
+# Seconds between full tracebacks logged for the same kind of error
+ERROR_LOG_INTERVAL = getattr(settings, "DJSONAPI_ERROR_LOG_INTERVAL", 60)
+
+# Maximum number of sub-requests accepted by `batch`
+BATCH_MAX_REQUESTS = getattr(settings, "DJSONAPI_BATCH_MAX_REQUESTS", 20)
+
+# Query parameter and value that select the columnar list layout, i.e. `?format=columnar`
+FORMAT_PARAM = "format"
+COLUMNAR_FORMAT = "columnar"
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+EVENT_STREAM_CONTENT_TYPE = "text/event-stream"
+
+# Seconds that each `changes_since` watermark overlaps the previous response, to cover transactions
+# that commit after the rows they changed were timestamped
+SYNC_OVERLAP = getattr(settings, "DJSONAPI_SYNC_OVERLAP", 10)
+
+# Query parameters naming the dimensions and metrics of `aggregate`, i.e. `?group_by=status&metrics=count`
+GROUP_BY_PARAM = "group_by"
+METRICS_PARAM = "metrics"
+
 ## JSON Builder ##
 
 def json_response(status, ok, message, **body):
     """
     Return an HttpResponse with a content type of "application/json" and the given status code.
     The JSON will have an "ok" status, message, and optional body.
+
+    Inside of a view decorated with `required_method`, the response is instead encoded as
+    MessagePack or CBOR when the request prefers it in its Accept header.
+
+    JSON is encoded straight to bytes, with the envelope written around each encoded body value,
+    so `serial.Encoded` body values are used without being encoded again.
     """
+    profiling.mark("encode")
+    content_type = serial.active_content_type()
+    if content_type == serial.JSON_CONTENT_TYPE:
+        response = http.HttpResponse(_json_envelope(ok, message, body), status=status)
+        response["Content-type"] = "application/json; charset=utf-8"
+        return response
+
     bag = {
         "ok": ok,
     }
@@ -24,11 +86,32 @@ def json_response(status, ok, message, **body):
         bag["body"] = body
     if message:
         bag["message"] = message
-    response = http.HttpResponse(serial.dumps(bag), status=status)
-    response["Content-type"] = "application/json; charset=utf-8"
+    response = http.HttpResponse(serial.dumps_as(content_type, bag), status=status)
+    response["Content-type"] = content_type
     return response
 
 
+def _json_envelope(ok, message, body):
+    """
+    Return the JSON bytes of a response envelope, joining the separately encoded parts once.
+    """
+    parts = [b'{"ok": ', b"true" if ok else b"false"]
+    if message:
+        parts.append(b', "message": ')
+        parts.append(serial.dumpb(message))
+    if body:
+        separator = b', "body": {'
+        for key, value in body.items():
+            parts.append(separator)
+            parts.append(serial.dumpb(key))
+            parts.append(b": ")
+            parts.append(value.content if isinstance(value, serial.Encoded) else serial.dumpb(value))
+            separator = b", "
+        parts.append(b"}")
+    parts.append(b"}")
+    return b"".join(parts)
+
+
 ## JSON Returners ##
 
 def ok(message=None, **body):
@@ -38,6 +121,41 @@ def ok(message=None, **body):
     return json_response(200, True, message, **body)
 
 
+def ok_list(request, name, items, fields, mode=None, message=None, **body):
+    """
+    Return a JSON response with a 200 status code containing a list of `items` in the body as `name`.
+
+    By default, each item is serialized using the registered serializer for `mode`.
+    When the request asks for `?format=columnar`, the items are instead serialized with
+    `serial.serialize_columns` using `fields`, which is much smaller for long lists:
+
+    {"fields": ["title", "status"], "rows": [["first", 1], ["second", 2]]}
+    """
+    if columnar_requested(request):
+        body[name] = serial.serialize_columns(items, fields)
+    else:
+        body[name] = serial.serialize(items, mode=mode)
+    return json_response(200, True, message, **body)
+
+
+def ok_compound(name, items, mode=None, include=None, message=None, **body):
+    """
+    Return a JSON response with a 200 status code containing `items` in the body as `name`,
+    serialized as a compound document with `serial.serialize_compound`.
+
+    The distinct related objects named by `include` are in the body as "included".
+    """
+    body[name], body["included"] = serial.serialize_compound(items, mode=mode, include=include)
+    return json_response(200, True, message, **body)
+
+
+def columnar_requested(request):
+    """
+    Return whether or not the request asked for the columnar list layout.
+    """
+    return request.GET.get(FORMAT_PARAM) == COLUMNAR_FORMAT
+
+
 def error(status, message=None, **body):
     """
     Return a JSON response with a specific status code, "error" flag, optional message, and optional body.
@@ -96,12 +214,577 @@ def exception(exc, debug=settings.DEBUG, log_error=True, **body):
 
     Optionally, the error can be logged using the "djsonapi" logger.
     """
-    log.error("Returning internal server error",
-              exc_info=True) if log_error else None
+    error_log.log("Returning internal server error", exc) if log_error else None
+    return error(500, _exception_message(exc, debug))
+
+
+def _exception_message(exc, debug):
+    """
+    Return the message describing an exception, which only includes details in debug mode.
+    """
     if debug:
-        return error(500, "DEBUG: %s" % (str(exc)))
+        return "DEBUG: %s" % (str(exc))
     else:
-        return error(500, "Internal Server Error")
+        return "Internal Server Error"
+
+
+## Error Logging ##
+
+def fingerprint(exc_info):
+    """
+    Return a short fingerprint of an exception from its type and the frames of its traceback,
+    so repeats of the same error can be recognized without formatting the traceback.
+    """
+    klass, exc, tb = exc_info
+    signature = [klass.__module__, klass.__name__]
+    for filename, lineno, name, line in traceback.extract_tb(tb):
+        signature.append("%s:%s:%s" % (filename, lineno, name))
+    return hashlib.md5("|".join(signature).encode("utf-8")).hexdigest()[:12]
+
+
+class ErrorLog(object):
+    """
+    Logs errors to the "djsonapi" logger, rate limited per fingerprint.
+
+    The full traceback of an error is logged at most once every `interval` seconds per fingerprint.
+    Repeats within the interval are counted, and reported once: with the next traceback of that error
+    or in a summary line logged at most once per interval, whichever comes first.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        # fingerprint => {"exception": <type name>, "count": <total>, "suppressed": <since last reported>}
+        self.errors = {}
+        # fingerprint => time the traceback was last logged
+        self.logged = {}
+        self.summarized = time.time()
+
+    def log(self, message, exc=None):
+        """
+        Log `message` with the exception being handled (or `exc`, outside of an except block).
+        """
+        exc_info = sys.exc_info()
+        if exc is not None and exc_info[1] is not exc:
+            exc_info = (exc.__class__, exc, None)
+        key = fingerprint(exc_info)
+        now = time.time()
+        summary = None
+        with self.lock:
+            error = self.errors.get(key)
+            if error is None:
+                error = self.errors[key] = {"exception": exc_info[0].__name__, "count": 0, "suppressed": 0}
+            error["count"] += 1
+            if now - self.logged.get(key, 0) < self.interval:
+                error["suppressed"] += 1
+                suppressed = None
+            else:
+                self.logged[key] = now
+                suppressed, error["suppressed"] = error["suppressed"], 0
+            if now - self.summarized >= self.interval:
+                self.summarized = now
+                summarized = [(other_key, other) for other_key, other in self.errors.items() if other["suppressed"]]
+                summary = ", ".join("%s %s x%d" % (other_key, other["exception"], other["suppressed"])
+                                    for other_key, other in summarized)
+                for other_key, other in summarized:
+                    other["suppressed"] = 0
+
+        if suppressed is not None:
+            if suppressed:
+                log.error("%s [%s, %d similar suppressed]", message, key, suppressed, exc_info=exc_info)
+            else:
+                log.error("%s [%s]", message, key, exc_info=exc_info)
+        if summary:
+            log.warning("Suppressed errors in the last %s seconds: %s", self.interval, summary)
+
+    def counts(self):
+        """
+        Return the number of times each error was seen: fingerprint => {"exception": <type name>, "count": <total>}
+        """
+        with self.lock:
+            return dict((key, {"exception": error["exception"], "count": error["count"]})
+                        for key, error in self.errors.items())
+
+
+# Error log used by `exception` and the streaming responses
+error_log = ErrorLog(ERROR_LOG_INTERVAL)
+
+
+def error_counts():
+    """
+    Return the counters of the errors logged by `exception`, for metrics.
+    """
+    return error_log.counts()
+
+
+## Streaming ##
+
+def stream_ndjson(items, mode=None, chunk_size=100, debug=settings.DEBUG, log_error=True, **kwargs):
+    """
+    Return a streaming response with one JSON document per line (NDJSON / JSON Lines).
+
+    Each item is serialized using the registered serializer for `mode`, and lines are
+    flushed to the client every `chunk_size` items. QuerySets are read with `iterator()`
+    so memory stays constant no matter how many rows are exported.
+
+    If an exception occurs mid-stream, the lines serialized so far are flushed and a final
+    `{"ok": false, "message": ...}` line is written, the same way `catch500` would respond.
+
+    Optional `kwargs` for the serializer function are passed down.
+    """
+    if hasattr(items, "iterator"):
+        items = items.iterator()
+    lines = _ndjson_lines(items, mode, chunk_size, debug, log_error, kwargs)
+    return http.StreamingHttpResponse(lines, content_type=NDJSON_CONTENT_TYPE)
+
+
+def _ndjson_lines(items, mode, chunk_size, debug, log_error, kwargs):
+    """
+    Generate chunks of newline terminated JSON documents for `stream_ndjson`.
+    """
+    lines = []
+    try:
+        for data in serial.iserialize(items, mode=mode, **kwargs):
+            lines.append(serial.dumps(data))
+            if len(lines) >= chunk_size:
+                lines.append("")
+                yield "\n".join(lines)
+                lines = []
+    except Exception as exc:
+        error_log.log("Error while streaming NDJSON", exc) if log_error else None
+        lines.append(serial.dumps({"ok": False, "message": _exception_message(exc, debug)}))
+    if lines:
+        lines.append("")
+        yield "\n".join(lines)
+
+
+class _Echo(object):
+    """
+    File-like object that returns what is written to it, so `csv.writer` can produce lines for streaming.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    """
+    Convert a serialized value into something `csv.writer` can write.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, tuple)):
+        value = serial.dumps(value)
+    elif not isinstance(value, six.string_types + six.integer_types + (float,)):
+        try:
+            value = serial.encode_default(value)
+        except TypeError:
+            value = six.text_type(value)
+    if six.PY2 and isinstance(value, six.text_type):
+        value = value.encode("utf-8")
+    return value
+
+
+def stream_csv(items, mode=None, fields=None, chunk_size=100, filename=None, **kwargs):
+    """
+    Return a streaming CSV response with one row per item.
+
+    Each item is serialized using the registered serializer for `mode`. The header is `fields` when given,
+    otherwise the sorted keys of the first serialized item. Rows are flushed every `chunk_size` items,
+    and QuerySets are read with `iterator()` so memory stays constant.
+
+    When `filename` is given, the response is sent as an attachment with that name.
+
+    Optional `kwargs` for the serializer function are passed down.
+    """
+    if hasattr(items, "iterator"):
+        items = items.iterator()
+    rows = _csv_rows(serial.iserialize(items, mode=mode, **kwargs), fields, chunk_size)
+    response = http.StreamingHttpResponse(rows, content_type=CSV_CONTENT_TYPE)
+    if filename:
+        response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+    return response
+
+
+def _csv_rows(data_items, fields, chunk_size):
+    """
+    Generate chunks of CSV lines for `stream_csv`.
+    """
+    writer = csv.writer(_Echo())
+    data_items = iter(data_items)
+    first = next(data_items, None)
+    if first is None:
+        data_items = ()
+    else:
+        data_items = itertools.chain((first,), data_items)
+        if fields is None:
+            fields = sorted(first.keys())
+
+    lines = []
+    if fields:
+        lines.append(writer.writerow([_csv_value(field) for field in fields]))
+    for data in data_items:
+        lines.append(writer.writerow([_csv_value(data.get(field)) for field in fields]))
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+## Counting ##
+
+def approximate_count(queryset, threshold=1000, cache_timeout=60):
+    """
+    Count a queryset without running an unbounded COUNT(*) on every request.
+
+    Returns a dict to put in an `ok` body: `{"count": <int>, "exact": <bool>}`.
+
+    Up to `threshold` rows are counted exactly, with a bounded query. Above that, the count is
+    the database planner"s estimate on PostgreSQL, or otherwise a count cached for `cache_timeout`
+    seconds, and `exact` is `False`.
+
+    e.x.
+
+    reports = Report.objects.filter(status=1)
+    return api.ok(total=api.approximate_count(reports), reports=serial.serialize(reports[:20]))
+    """
+    bounded = queryset[:threshold + 1].count()
+    if bounded <= threshold:
+        return {"count": bounded, "exact": True}
+
+    estimate = _planner_estimate(queryset)
+    if estimate is not None:
+        return {"count": max(estimate, bounded), "exact": False}
+
+    query = six.text_type(queryset.query).encode("utf-8")
+    key = "djsonapi.count.%s.%s" % (queryset.db, hashlib.md5(query).hexdigest())
+    cached = cache.get(key)
+    if cached is not None:
+        return {"count": cached, "exact": False}
+    exact = queryset.count()
+    cache.set(key, exact, cache_timeout)
+    return {"count": exact, "exact": True}
+
+
+def _planner_estimate(queryset):
+    """
+    Return the PostgreSQL planner"s estimate of the number of rows in `queryset`, or `None` on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    cursor = connection.cursor()
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, six.string_types):
+        plan = serial.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def event_stream(request, channels, heartbeat=15, broker=None):
+    """
+    Return a Server-Sent Events response streaming the events published to `channels`,
+    e.g. by `djsonapi.events.publish_model_events`, so clients don't need to poll.
+
+    Each event is sent with its id, name and JSON data. A comment line is sent every `heartbeat`
+    seconds without events to keep the connection open. Clients reconnecting with a `Last-Event-ID`
+    header receive the events they missed, while they are still kept by the broker.
+
+    Every open stream holds a worker thread, so serve these from a threaded or async worker.
+    """
+    broker = broker or events.broker
+    last_event_id = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    response = http.StreamingHttpResponse(_sse_lines(broker, channels, last_event_id, heartbeat),
+                                          content_type=EVENT_STREAM_CONTENT_TYPE)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _sse_lines(broker, channels, last_event_id, heartbeat):
+    """
+    Generate the Server-Sent Events of `channels` for `event_stream`.
+
+    The subscription is only made once the stream is read, so a response closed unread
+    (e.g. for a HEAD request) never subscribes, and it is closed with the stream.
+    """
+    subscription = broker.subscribe(channels, last_event_id)
+    try:
+        while True:
+            message = subscription.get(heartbeat)
+            if message is None:
+                yield ": heartbeat\n\n"
+            else:
+                event_id, channel, event, data = message
+                yield "id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event, data)
+    finally:
+        subscription.close()
+
+
+## Sync ##
+
+def changes_since(queryset, request, updated_field="updated", mode=None, param="since",
+                  overlap=SYNC_OVERLAP, **body):
+    """
+    Return a JSON response with the rows of `queryset` changed since the watermark in `request.GET[param]`.
+
+    The body contains:
+
+    - "changes": rows whose `updated_field` is after the watermark, serialized with `mode`
+    - "deleted": primary keys deleted after the watermark (see `djsonapi.models.track_deletions`)
+    - "watermark": the token to send as `param` on the next request
+
+    The watermark is `overlap` seconds before the time of the request, so rows and tombstones whose
+    timestamp was set before the request but whose transaction committed after it are still returned
+    next time. Rows and deletions within the overlap are returned again, and clients should apply them
+    idempotently (by primary key).
+
+    Without a watermark, every row is returned. An unreadable watermark returns 400 "Invalid Watermark".
+    """
+    now = timezone.now()
+    token = request.GET.get(param)
+    changes = queryset.filter(**{"%s__lte" % updated_field: now})
+    deleted = []
+    if token:
+        # Offsets of older watermarks sent back unescaped have their "+" decoded to a space
+        since = parse_datetime(token.replace(" ", "+"))
+        if since is None:
+            return invalid("Invalid Watermark")
+        changes = changes.filter(**{"%s__gt" % updated_field: since})
+        deleted = list(Tombstone.objects.filter(model=model_label(queryset.model), deleted__gt=since,
+                                                deleted__lte=now).values_list("object_pk", flat=True))
+    body["changes"] = serial.serialize(changes, mode=mode)
+    body["deleted"] = deleted
+    body["watermark"] = _watermark(now - timedelta(seconds=overlap))
+    return ok(**body)
+
+
+def _watermark(value):
+    """
+    Return a URL-safe watermark token for datetime `value`: UTC with a "Z" suffix rather than "+00:00",
+    which would decode to a space when sent back unescaped in a query string.
+    """
+    if timezone.is_aware(value):
+        return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+    return value.isoformat()
+
+
+## Aggregation ##
+
+def aggregate(queryset, request, dimensions, metrics, name="groups", message=None, **body):
+    """
+    Return a JSON response with `queryset` grouped and aggregated in the database as `name`.
+
+    `dimensions` is a list of the field names that may be grouped by, and `metrics` maps metric names
+    to the aggregates that may be computed, e.g. `{"count": Count("pk"), "total": Sum("status")}`.
+    The request chooses among them with comma separated lists, e.g. `?group_by=status&metrics=count`.
+    Without `group_by`, the whole queryset is aggregated as one group. Without `metrics`, every metric is computed.
+
+    The groups are serialized in the columnar layout, ordered by dimension:
+
+    {"fields": ["status", "count"], "rows": [[1, 12], [2, 30]]}
+
+    Unknown dimensions or metrics return 400 "Invalid Dimension" or "Invalid Metric".
+    """
+    group_by = _param_list(request, GROUP_BY_PARAM)
+    chosen = _param_list(request, METRICS_PARAM) or sorted(metrics)
+    unknown = [dimension for dimension in group_by if dimension not in dimensions]
+    if unknown:
+        return invalid("Invalid Dimension", dimensions=unknown)
+    unknown = [metric for metric in chosen if metric not in metrics]
+    if unknown:
+        return invalid("Invalid Metric", metrics=unknown)
+
+    aggregates = dict((metric, metrics[metric]) for metric in chosen)
+    if group_by:
+        groups = queryset.values(*group_by).annotate(**aggregates).order_by(*group_by)
+    else:
+        groups = [queryset.aggregate(**aggregates)]
+    fields = group_by + chosen
+    body[name] = {"fields": fields, "rows": [[group[field] for field in fields] for group in groups]}
+    return ok(message, **body)
+
+
+def _param_list(request, param):
+    """
+    Return the distinct values of a repeatable, comma separated query parameter in order.
+    """
+    values = []
+    for value in request.GET.getlist(param):
+        for item in value.split(","):
+            item = item.strip()
+            if item and item not in values:
+                values.append(item)
+    return values
+
+
+## Form Validation ##
+
+class InvalidLightweightForm(Exception):
+    """
+    Raised when the full form behind a `LightweightForm` doesn't validate, carrying it as `form`.
+    `post_form` responds to it with `invalid_form`.
+    """
+
+    def __init__(self, form):
+        super(InvalidLightweightForm, self).__init__("%s did not validate" % form.__class__.__name__)
+        self.form = form
+
+
+class LightweightForm(object):
+    """
+    Stand-in for a form whose data was validated field by field without constructing the form.
+
+    `cleaned_data` and `data` are available immediately. The full form is only constructed
+    (and validated) when something else is needed from it, such as `save()`.
+    If the full form doesn't validate, `InvalidLightweightForm` is raised.
+    """
+
+    def __init__(self, form_klass, data, cleaned_data):
+        self.form_klass = form_klass
+        self.data = data
+        self.cleaned_data = cleaned_data
+        self._form = None
+
+    def is_valid(self):
+        return True
+
+    @property
+    def form(self):
+        """
+        The full form, constructed and validated on first access.
+        """
+        if self._form is None:
+            form = self.form_klass(data=self.data)
+            if not form.is_valid():
+                raise InvalidLightweightForm(form)
+            self._form = form
+        return self._form
+
+    def save(self, *args, **kwargs):
+        return self.form.save(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.form, name)
+
+
+def _unbound(method):
+    """
+    Return the function behind a (possibly unbound) method.
+    """
+    return getattr(method, "__func__", method)
+
+
+def compile_form_validator(form_klass):
+    """
+    Return a function that validates a dict against the fields of `form_klass` without constructing the form.
+
+    The function returns the cleaned data, or `None` if any field is invalid.
+
+    Returns `None` instead of a function when the form can only be validated by constructing it:
+    model forms (whose model field validators and `Model.clean()` run on a constructed instance),
+    forms with a custom `__init__()` (which may change their fields), `clean_<field>` methods,
+    a custom `clean()`, or file fields.
+    """
+    if not isinstance(form_klass, type) or not hasattr(form_klass, "base_fields"):
+        return None
+    if issubclass(form_klass, forms.BaseModelForm):
+        return None
+    fields = list(form_klass.base_fields.items())
+
+    if _unbound(form_klass.__init__) is not _unbound(forms.BaseForm.__init__):
+        return None
+    if _unbound(form_klass.clean) is not _unbound(forms.BaseForm.clean):
+        return None
+    if _unbound(form_klass._post_clean) is not _unbound(forms.BaseForm._post_clean):
+        return None
+    for name, field in fields:
+        if hasattr(form_klass, "clean_%s" % name) or isinstance(field, forms.FileField):
+            return None
+
+    def validate(data):
+        cleaned_data = {}
+        for name, field in fields:
+            value = field.widget.value_from_datadict(data, {}, name)
+            try:
+                cleaned_data[name] = field.clean(value)
+            except forms.ValidationError:
+                return None
+        return cleaned_data
+
+    return validate
+
+
+def merge_patch(target, patch):
+    """
+    Apply a JSON Merge Patch (RFC 7396) to `target` and return the result, without modifying `target`.
+
+    Objects are merged recursively, `None` removes a key, and anything else replaces the target.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+class _PatchFormMixin(object):
+    """
+    Saves only the fields of the patch, using `update_fields`.
+    """
+    patch_fields = ()
+
+    def save(self, commit=True):
+        instance = super(_PatchFormMixin, self).save(commit=False)
+        if commit:
+            many_to_many = set(field.name for field in instance._meta.many_to_many)
+            update_fields = [name for name in self.patch_fields if name not in many_to_many]
+            if update_fields:
+                instance.save(update_fields=update_fields)
+            self.save_m2m()
+        return instance
+
+
+# (form_klass, patch fields) => patch form class
+_patch_form_classes = {}
+
+
+def _patch_form_class(form_klass, fields):
+    """
+    Return a subclass of the model form `form_klass` with only `fields`, which saves only those fields.
+    """
+    key = (form_klass, fields)
+    try:
+        return _patch_form_classes[key]
+    except KeyError:
+        pass
+    klass = form_klass.__class__("Patch%s" % form_klass.__name__, (_PatchFormMixin, form_klass),
+                                 {"patch_fields": fields, "__module__": form_klass.__module__})
+    klass.base_fields = SortedDict((name, field) for name, field in klass.base_fields.items() if name in fields)
+    _patch_form_classes[key] = klass
+    return klass
+
+
+def patch_form(form_klass, instance, patch):
+    """
+    Return a model form bound to the JSON Merge Patch `patch` of `instance`.
+
+    Only the fields present in the patch are bound and validated, and `save()` only writes those
+    columns, using `update_fields`. Object values are merged into the current field value.
+    """
+    fields = tuple(sorted(name for name in patch if name in form_klass.base_fields))
+    current = model_to_dict(instance, fields=fields)
+    data = dict((name, merge_patch(current.get(name), patch[name])) for name in fields)
+    return _patch_form_class(form_klass, fields)(data=data, instance=instance)
 
 
 ## Decorators ##
@@ -168,16 +851,33 @@ def required_method(*methods, **kwargs):
 
     If the request body fails to parse as JSON, 400 "Invalid JSON POST" or "Invalid JSON PUT" will be returned.
 
+    Bodies sent as "application/msgpack" or "application/cbor" are decoded according to their Content-Type,
+    and responses are encoded in whichever of those the Accept header prefers.
+
     Optional kwarg: "debug" : by default it is `True` in `DEBUG` mode.
     When `True`, if the body fails to parse as JSON, an exception will be contained in the response body.
     @require_method("POST", debug=True)
+
+    Optional kwarg: "read_replica" : a database alias that GET and HEAD requests read from,
+    used with `djsonapi.routers.ReplicaRouter`. After a user writes (POST, PUT, PATCH, DELETE)
+    they read from the default database for `DJSONAPI_REPLICA_STICKY_SECONDS`.
+    @require_method("GET", "POST", read_replica="replica")
     """
 
     debug = kwargs.get("debug", settings.DEBUG)
+    read_replica = kwargs.get("read_replica")
 
     def required_methods_decorator(func):
         @wraps(func)
         def wrapper(request, *args, **kwargs):
+            content_type = serial.negotiate(request.META.get("HTTP_ACCEPT"))
+            with serial.use_content_type(content_type), routers.route_request(request, read_replica):
+                response = handle(request, *args, **kwargs)
+            if response is not None:
+                patch_vary_headers(response, ("Accept",))
+            return response
+
+        def handle(request, *args, **kwargs):
             # if the request method is acceptable
             if request.method in methods:
                 # if its post
@@ -186,7 +886,7 @@ def required_method(*methods, **kwargs):
                     if request.body:
                         try:
                             # parse that body
-                            post = serial.loads(request.body)
+                            post = serial.loads_as(request.META.get("CONTENT_TYPE"), request.body)
                         except Exception as exc:
                             # unless it doesnt parse
                             if debug:
@@ -214,7 +914,7 @@ def required_method(*methods, **kwargs):
 
 
 def post_form(form_klass, form_method_types=FORM_METHOD_TYPES,
-              add=lambda request: {}):
+              add=lambda request: {}, lightweight=False, instance=None):
     """
     Intercept posts/puts and send that data to a form.
 
@@ -224,6 +924,15 @@ def post_form(form_klass, form_method_types=FORM_METHOD_TYPES,
 
     If the form does not validate, respond with json describing the form errors (400 "Invalid Form")
 
+    With `lightweight=True`, a `django.forms.Form` class is validated field by field using
+    `compile_form_validator`, and the view receives a `LightweightForm` with `cleaned_data`.
+    The full form is only constructed to render errors or when the view needs more than
+    `cleaned_data`. Model forms, and other forms that can't be validated this way, are handled normally.
+
+    `instance` can be a function that accepts (request, *args, **kwargs) and returns the model instance a
+    `ModelForm` class edits, or `None` to respond 404 "Not Found". PATCH requests are then treated as a
+    JSON Merge Patch using `patch_form`: only the supplied fields are validated and saved.
+
     This decorator must be used in conjunction with `@required_method`
 
     e.x.
@@ -241,6 +950,9 @@ def post_form(form_klass, form_method_types=FORM_METHOD_TYPES,
         return api.ok(user=data)
     """
 
+    validator = compile_form_validator(form_klass) if lightweight and instance is None else None
+    is_model_form = isinstance(form_klass, type) and issubclass(form_klass, forms.BaseModelForm)
+
     def post_form_decorator(func):
         @wraps(func)
         def wrapper(request, *args, **kwargs):
@@ -258,12 +970,30 @@ def post_form(form_klass, form_method_types=FORM_METHOD_TYPES,
                 add_this = add(request)
                 post.update(add_this)
 
+                # Validate without creating the form when possible
+                if validator is not None:
+                    cleaned_data = validator(post)
+                    if cleaned_data is not None:
+                        kwargs["form"] = LightweightForm(form_klass, post, cleaned_data)
+                        try:
+                            return func(request, *args, **kwargs)
+                        except InvalidLightweightForm as exc:
+                            return invalid_form(exc.form)
+
                 # Create form
                 if isinstance(form_klass, type(
                         lambda: None)) and form_klass.__name__ == "<lambda>":
                     form = form_klass(request, post)
                     if isinstance(form, dict):
                         form = form[request.method]
+                elif instance is not None and is_model_form:
+                    obj = instance(request, *args, **kwargs)
+                    if obj is None:
+                        return error404()
+                    if request.method == "PATCH":
+                        form = patch_form(form_klass, obj, post)
+                    else:
+                        form = form_klass(data=post, instance=obj)
                 else:
                     form = form_klass(data=post)
 
@@ -279,3 +1009,364 @@ def post_form(form_klass, form_method_types=FORM_METHOD_TYPES,
         return wrapper
 
     return post_form_decorator
+
+
+def filter_query(filterset_klass):
+    """
+    Validate the query parameters of GET and HEAD requests with a `djsonapi.filters.FilterSet` before the view runs.
+
+    If the parameters are valid, pass the filterset as the `filters` kwarg to the view function.
+    Views receive no `filters` kwarg for other methods.
+    Otherwise, respond with json describing the errors (400 "Invalid Filter") without touching the database.
+
+    e.x.
+
+    @required_method("GET")
+    @filter_query(ReportFilters)
+    def reports(request, filters=None):
+        return api.ok_list(request, "reports", filters.filter(Report.objects.all()), ["title", "status"])
+    """
+
+    def filter_query_decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return func(request, *args, **kwargs)
+            filterset = filterset_klass(request.GET)
+            if not filterset.is_valid():
+                return invalid("Invalid Filter", errors=filterset.errors)
+            kwargs["filters"] = filterset
+            return func(request, *args, **kwargs)
+
+        return wrapper
+
+    return filter_query_decorator
+
+
+class _Gate(object):
+    """
+    Counts the in-flight requests of a view decorated with `limit_concurrency`.
+    """
+
+    def __init__(self, max_inflight):
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.condition = threading.Condition()
+
+    def enter(self, timeout):
+        """
+        Wait up to `timeout` seconds for a free slot. Returns `False` if none became free.
+        """
+        with self.condition:
+            if self.inflight >= self.max_inflight and timeout > 0:
+                deadline = time.time() + timeout
+                while self.inflight >= self.max_inflight:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            if self.inflight >= self.max_inflight:
+                return False
+            self.inflight += 1
+            return True
+
+    def exit(self):
+        with self.condition:
+            self.inflight -= 1
+            self.condition.notify()
+
+
+def limit_concurrency(max_inflight, queue_timeout=0.1, retry_after=1):
+    """
+    Limit the number of requests a view handles at once in this process.
+    Each view decorated with the result has its own limit.
+
+    A request waits up to `queue_timeout` seconds for one of the `max_inflight` slots, otherwise
+    503 "Service Unavailable" is returned right away with a `Retry-After` of `retry_after` seconds,
+    so slow views can't tie up every worker thread.
+    """
+    content = serial.dumps({"ok": False, "message": "Service Unavailable"})
+
+    def decorator(func):
+        gate = _Gate(max_inflight)
+
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if not gate.enter(queue_timeout):
+                response = http.HttpResponse(content, status=503)
+                response["Content-type"] = "application/json; charset=utf-8"
+                response["Retry-After"] = str(retry_after)
+                return response
+            try:
+                return func(request, *args, **kwargs)
+            finally:
+                gate.exit()
+
+        wrapper.gate = gate
+        return wrapper
+
+    return decorator
+
+
+class _Flight(object):
+    """
+    A response being computed by one thread for requests coalesced by `coalesce`.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+# (view, key) => _Flight for every coalesced request currently being computed
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _coalesce_key(request):
+    """
+    Default `coalesce` key: the full path, Accept and Authorization headers, session, and user of the request.
+    """
+    user = getattr(request, "user", None)
+    session = getattr(request, "session", None)
+    return (request.get_full_path(), request.META.get("HTTP_ACCEPT"), request.META.get("HTTP_AUTHORIZATION"),
+            getattr(session, "session_key", None), getattr(user, "pk", None))
+
+
+def coalesce(key_func=_coalesce_key, timeout=10):
+    """
+    Coalesce identical concurrent GET and HEAD requests within this process.
+
+    The first request computes the response while identical requests (by `key_func(request)`)
+    wait for it and receive a copy of its status, headers and encoded content.
+    If the response is not ready within `timeout` seconds, a waiting request runs the view itself.
+
+    The default key is the full path, Accept and Authorization headers, session and user of the request.
+    Views whose responses depend on anything else about the caller, e.g. an API key in another header,
+    must pass a `key_func` including it, or one caller's response is served to another.
+
+    e.x.
+
+    @coalesce(key_func=lambda request: request.get_full_path())
+    @required_method("GET")
+    def leaderboard(request):
+        pass
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return func(request, *args, **kwargs)
+
+            key = (wrapper, key_func(request))
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _flights[key] = _Flight()
+
+            if leader:
+                try:
+                    response = func(request, *args, **kwargs)
+                    if not getattr(response, "streaming", False):
+                        flight.result = (response.status_code, response.content, list(response.items()))
+                    return response
+                finally:
+                    with _flights_lock:
+                        del _flights[key]
+                    flight.done.set()
+
+            if flight.done.wait(timeout) and flight.result is not None:
+                status, content, headers = flight.result
+                response = http.HttpResponse(content, status=status)
+                for header, value in headers:
+                    response[header] = value
+                return response
+            return func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+## Deferred Exports ##
+
+def deferred(items, mode=None, backend=None, **body):
+    """
+    Start a background job that serializes `items` with `mode` into a file, and return
+    a JSON response with a 202 status code, "Accepted" message, and the job status in the body as "job".
+
+    The job runs on the backend from `DJSONAPI_JOB_BACKEND` (by default a thread pool in this process)
+    unless `backend` is given. Clients poll `job_status` until it is "done", then fetch `job_download`.
+    Finished jobs are kept until deleted by `jobs.prune_exports`, which should be run periodically.
+
+    The random job id is the only credential needed to read the job: `job_status` and `job_download`
+    don't check who started it, so only give the id to the user it is meant for.
+
+    e.x.
+
+    @required_method("POST")
+    def export_reports(request, post=None):
+        return api.deferred(Report.objects.all(), mode="full")
+    """
+    job_id = jobs.start_export(items, mode=mode, backend=backend)
+    body["job"] = jobs.status(job_id)
+    return json_response(202, True, "Accepted", **body)
+
+
+@required_method("GET")
+def job_status(request, job_id):
+    """
+    View returning the status of a `deferred` job, or 404 "Not Found".
+    Anyone with the job id can read it.
+
+    url(r"^jobs/(?P<job_id>[0-9a-f]+)/$", api.job_status)
+    """
+    status = jobs.status(job_id)
+    if status is None:
+        return error404()
+    return ok(job=status)
+
+
+@required_method("GET")
+def job_download(request, job_id):
+    """
+    View streaming the JSON file written by a finished `deferred` job, or 404 "Not Found".
+    Anyone with the job id can read it.
+
+    url(r"^jobs/(?P<job_id>[0-9a-f]+)/download/$", api.job_download)
+    """
+    status = jobs.status(job_id)
+    if status is None or status["status"] != jobs.DONE:
+        return error404(job=status)
+    response = http.StreamingHttpResponse(FileWrapper(open(jobs.export_path(job_id), "rb")),
+                                          content_type="application/json; charset=utf-8")
+    response["Content-Disposition"] = 'attachment; filename="%s.json"' % job_id
+    return response
+
+
+## Batch ##
+
+def _sub_request(request, method, path, body):
+    """
+    Return a copy of `request` for a sub-request of `batch`, keeping its user, session, and headers.
+    """
+    path, _, query_string = path.partition("?")
+    content = serial.dumps(body) if body is not None else ""
+    if isinstance(content, six.text_type):
+        content = content.encode("utf-8")
+
+    sub_request = copy.copy(request)
+    sub_request.method = method
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = dict(request.META, REQUEST_METHOD=method, PATH_INFO=path, QUERY_STRING=query_string,
+                            CONTENT_TYPE=serial.JSON_CONTENT_TYPE, CONTENT_LENGTH=str(len(content)),
+                            HTTP_ACCEPT=serial.JSON_CONTENT_TYPE)
+    sub_request.GET = http.QueryDict(query_string)
+    sub_request._body = content
+    sub_request._post = http.QueryDict("")
+    sub_request._files = {}
+    sub_request.djsonapi_batch = True
+    return sub_request
+
+
+def _dispatch(request, method, path, body):
+    """
+    Run one sub-request of `batch` through URL resolution and return its `{status, ok, message, body}`.
+    """
+    sub_request = _sub_request(request, method, path, body)
+    with serial.use_content_type(serial.JSON_CONTENT_TYPE):
+        try:
+            match = resolve(sub_request.path_info)
+        except Resolver404:
+            response = error404()
+        else:
+            response = CsrfViewMiddleware().process_view(sub_request, match.func, match.args, match.kwargs)
+            if response is None:
+                try:
+                    response = match.func(sub_request, *match.args, **match.kwargs)
+                except http.Http404:
+                    response = error404()
+                except PermissionDenied:
+                    response = error403()
+                except Exception as exc:
+                    response = exception(exc)
+
+    result = {"status": response.status_code, "ok": 200 <= response.status_code < 300}
+    if not getattr(response, "streaming", False) and response.get("Content-type", "").startswith(
+            serial.JSON_CONTENT_TYPE):
+        data = serial.loads(response.content)
+        for key in ("ok", "message", "body"):
+            if key in data:
+                result[key] = data[key]
+    return result
+
+
+def _dispatch_threaded(request, calls):
+    """
+    Run GET sub-requests of `batch` concurrently, one thread each, and return their results in order.
+    """
+    results = [None] * len(calls)
+
+    def run(index, call):
+        try:
+            results[index] = _dispatch(request, *call)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def batch_view(max_requests=BATCH_MAX_REQUESTS, parallel=False):
+    """
+    Return a view that runs a JSON array of sub-requests against the other views of the project,
+    saving clients a round trip per request.
+
+    The POST body is `[{"method": "GET", "path": "/api/reports/?page=2"}, {"method": "POST", "path": "...", "body": {...}}]`
+    and the response body is `{"results": [{"status": 200, "ok": true, "body": {...}}, ...]}` in the same order.
+
+    Sub-requests share the user, session and headers of the batch request, and run in order.
+    With `parallel=True`, consecutive GET sub-requests run concurrently in threads.
+
+    Sub-requests skip the middleware of the project. Since the batch view has to be `csrf_exempt` to accept
+    writes to views that are, the CSRF check of `CsrfViewMiddleware` is instead run on each sub-request
+    against the cookie and `X-CSRFToken` header of the batch request: writes to views that aren't
+    `csrf_exempt` are rejected with 403 without a valid token. Other middleware, e.g. authentication
+    from a header, is not run for sub-requests.
+    """
+
+    @required_method("POST")
+    def batch(request, post=None):
+        if getattr(request, "djsonapi_batch", False):
+            return invalid("Nested Batch")
+        if not isinstance(post, list) or not all(isinstance(item, dict) and item.get("path") for item in post):
+            return invalid("Invalid Batch")
+        if len(post) > max_requests:
+            return invalid("Too Many Requests", max_requests=max_requests)
+
+        calls = [(item.get("method", "GET").upper(), item["path"], item.get("body")) for item in post]
+        results = []
+        index = 0
+        while index < len(calls):
+            if parallel and calls[index][0] == "GET":
+                end = index
+                while end < len(calls) and calls[end][0] == "GET":
+                    end += 1
+                results.extend(_dispatch_threaded(request, calls[index:end]))
+                index = end
+            else:
+                results.append(_dispatch(request, *calls[index]))
+                index += 1
+        return ok(results=results)
+
+    return batch
+
+
+# Batch view with the default settings
+batch = batch_view()
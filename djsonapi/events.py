@@ -0,0 +1,133 @@
+import collections
+import itertools
+import threading
+
+from django.db.models.signals import post_delete, post_save
+from django.utils.six.moves import queue
+
+from djsonapi import serial
+from djsonapi.models import model_label
+
+# Number of recent events kept for clients resuming with Last-Event-ID
+HISTORY_SIZE = 1000
+# Number of events queued per subscriber before the oldest are dropped
+QUEUE_SIZE = 100
+
+
+class Subscription(object):
+    """
+    Events of some channels of a `Broker`, queued for one client.
+
+    The queue is bounded: when a slow client falls behind, its oldest events are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, broker, channels, queue_size):
+        self.broker = broker
+        self.channels = set(channels)
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+
+    def put(self, message):
+        if message[1] not in self.channels:
+            return
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """
+        Return the next (id, channel, event, data) message, or `None` if there is none within `timeout` seconds.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(object):
+    """
+    In-process publish/subscribe of events to `Subscription` queues.
+
+    Event data is encoded as JSON once when published, and shared by every subscriber.
+    Event ids increase within the process, and the last `history_size` events are kept
+    so that a client can resume from the last event id it received.
+    """
+
+    def __init__(self, history_size=HISTORY_SIZE, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.history = collections.deque(maxlen=history_size)
+        self.subscriptions = set()
+
+    def publish(self, channel, event, data):
+        """
+        Publish an event with `data` to the subscribers of `channel` and return its id.
+        """
+        data = serial.dumps(data)
+        with self.lock:
+            message = (next(self.ids), channel, event, data)
+            self.history.append(message)
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.put(message)
+        return message[0]
+
+    def subscribe(self, channels, last_event_id=None):
+        """
+        Return a `Subscription` to `channels`, replaying the kept events after `last_event_id` when given.
+        """
+        subscription = Subscription(self, channels, self.queue_size)
+        with self.lock:
+            if last_event_id is not None:
+                for message in self.history:
+                    if message[0] > last_event_id:
+                        subscription.put(message)
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+
+# Broker used when none is given
+broker = Broker()
+
+
+def publish_model_events(model, mode=None, channel=None, broker=broker):
+    """
+    Publish an event to `channel` (by default the model label) whenever an instance of `model` is saved or deleted.
+
+    Saved instances are serialized with `mode` as "created" or "updated" events, and deleted
+    instances are published as "deleted" events with their primary key.
+
+    Returns a function that stops publishing the events.
+    """
+    channel = channel or model_label(model)
+    dispatch_uid = "djsonapi.events.%s.%s.%d" % (model_label(model), channel, id(broker))
+
+    def on_save(sender, instance, created, **kwargs):
+        broker.publish(channel, "created" if created else "updated", serial.serialize(instance, mode=mode))
+
+    def on_delete(sender, instance, **kwargs):
+        broker.publish(channel, "deleted", {"pk": instance.pk})
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+    def disconnect():
+        post_save.disconnect(sender=model, dispatch_uid=dispatch_uid)
+        post_delete.disconnect(sender=model, dispatch_uid=dispatch_uid)
+
+    return disconnect
@@ -0,0 +1,169 @@
+import logging
+
+from django import forms
+from django.conf import settings
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql.constants import QUERY_TERMS
+from django.utils import six
+from django.utils.datastructures import SortedDict
+
+log = logging.getLogger("djsonapi")
+
+# Query parameter naming the ordering of a `FilterSet`, i.e. `?ordering=-updated,title`
+ORDERING_PARAM = "ordering"
+
+# (FilterSet, model) pairs whose fields were already checked for indexes
+_checked = set()
+
+
+class Filter(object):
+    """
+    A query parameter of a `FilterSet`, validated with the form field `field` and applied as the ORM `lookup`.
+
+    The lookup defaults to the parameter name, e.g. `status__gte = Filter(forms.IntegerField())`.
+    """
+
+    creation_counter = 0
+
+    def __init__(self, field, lookup=None):
+        self.field = field
+        self.field.required = False
+        self.lookup = lookup
+        self.creation_counter = Filter.creation_counter
+        Filter.creation_counter += 1
+
+
+class FilterSetMetaclass(type):
+    """
+    Collect the declared `Filter`s of a `FilterSet` into `base_filters`, and build the form validating them.
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        filters = [(key, attrs.pop(key)) for key, value in list(attrs.items()) if isinstance(value, Filter)]
+        filters.sort(key=lambda item: item[1].creation_counter)
+        klass = super(FilterSetMetaclass, mcs).__new__(mcs, name, bases, attrs)
+
+        base_filters = SortedDict()
+        for base in reversed(klass.__mro__[1:]):
+            base_filters.update(getattr(base, "base_filters", {}))
+        for key, value in filters:
+            value.lookup = value.lookup or key
+            base_filters[key] = value
+        klass.base_filters = base_filters
+        klass.form_class = type(str("%sForm" % name), (forms.Form,),
+                                dict((key, value.field) for key, value in base_filters.items()))
+        return klass
+
+
+class FilterSet(six.with_metaclass(FilterSetMetaclass, object)):
+    """
+    Declarative filtering of a queryset with whitelisted query parameters, pushed to the database as ORM lookups.
+
+    class ReportFilters(FilterSet):
+        status = Filter(forms.IntegerField())
+        title = Filter(forms.CharField(), lookup="title__icontains")
+        ordering = ("title", "updated")
+
+    filters = ReportFilters(request.GET)
+    if not filters.is_valid():
+        return api.invalid("Invalid Filter", errors=filters.errors)
+    reports = filters.filter(Report.objects.all())
+
+    Parameters that aren't given, or are empty (e.g. `?status=`), aren't filtered on. `?ordering=` may name the fields in `ordering`, each optionally
+    descending with a "-" prefix.
+
+    When `DEBUG` is on, a warning is logged the first time a filter or ordering field that isn't backed by a
+    database index is used, since filtering or ordering by it scans the table.
+    """
+
+    ordering = ()
+
+    def __init__(self, data):
+        self.data = data
+        self.form = self.form_class(data=data)
+        self._errors = None
+
+    @property
+    def errors(self):
+        if self._errors is None:
+            self._errors = dict(self.form.errors)
+            invalid = [name for name in self.order_by() if name.lstrip("-") not in self.ordering]
+            if invalid:
+                self._errors[ORDERING_PARAM] = ["Invalid ordering: %s" % ", ".join(invalid)]
+        return self._errors
+
+    def is_valid(self):
+        return not self.errors
+
+    def order_by(self):
+        """
+        Return the field names given in the ordering parameter.
+        """
+        value = self.data.get(ORDERING_PARAM) or ""
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    def filter(self, queryset):
+        """
+        Return `queryset` filtered and ordered by the valid parameters.
+        """
+        if not self.is_valid():
+            raise ValueError("%s has invalid parameters" % self.__class__.__name__)
+        if settings.DEBUG:
+            check_indexes(self.__class__, queryset.model)
+
+        lookups = {}
+        for name, value in self.base_filters.items():
+            cleaned = self.form.cleaned_data.get(name)
+            if name in self.data and cleaned not in value.field.empty_values:
+                lookups[value.lookup] = cleaned
+        if lookups:
+            queryset = queryset.filter(**lookups)
+        order_by = self.order_by()
+        if order_by:
+            queryset = queryset.order_by(*order_by)
+        return queryset
+
+
+def check_indexes(filterset_klass, model):
+    """
+    Log a warning for each filter or ordering field of `filterset_klass` that isn't indexed on `model`.
+    Each FilterSet is only checked once per model.
+    """
+    if (filterset_klass, model) in _checked:
+        return
+    _checked.add((filterset_klass, model))
+    lookups = [value.lookup for value in filterset_klass.base_filters.values()] + list(filterset_klass.ordering)
+    for lookup in lookups:
+        if not is_indexed(model, lookup):
+            log.warning("%s filters or orders %s by %r, which has no database index",
+                        filterset_klass.__name__, model._meta.object_name, lookup)
+
+
+def is_indexed(model, lookup):
+    """
+    Return whether or not the field a `lookup` ends at is indexed: a primary key, unique,
+    `db_index`, or the first field of an `index_together`.
+
+    Lookups that can't be resolved to a concrete field (e.g. reverse relations) are assumed to be indexed.
+    """
+    parts = lookup.split(LOOKUP_SEP)
+    if len(parts) > 1 and parts[-1] in QUERY_TERMS:
+        parts = parts[:-1]
+    opts = model._meta
+    field = None
+    for index, part in enumerate(parts):
+        try:
+            field = opts.pk if part == "pk" else opts.get_field_by_name(part)[0]
+        except FieldDoesNotExist:
+            return True
+        rel = getattr(field, "rel", None)
+        if index < len(parts) - 1:
+            if rel is None or not hasattr(field, "column"):
+                return True
+            opts = rel.to._meta
+    if not hasattr(field, "column"):
+        return True
+    if field.primary_key or field.unique or field.db_index:
+        return True
+    return any(fields and fields[0] == field.name for fields in opts.index_together)
@@ -0,0 +1,212 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+from django import db
+from django.conf import settings
+from django.utils.module_loading import import_by_path
+from django.utils.six.moves import queue
+
+from djsonapi import serial
+
+log = logging.getLogger("djsonapi")
+
+# Directory that export files, and the status files describing them, are written to
+EXPORT_DIR = getattr(settings, "DJSONAPI_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "djsonapi-exports"))
+# Dotted path of the backend that runs export jobs
+BACKEND = getattr(settings, "DJSONAPI_JOB_BACKEND", "djsonapi.jobs.ThreadBackend")
+# Number of serialized items written to the export file at a time
+CHUNK_SIZE = 1000
+# Seconds after which finished jobs are deleted by `prune_exports`
+EXPORT_MAX_AGE = getattr(settings, "DJSONAPI_EXPORT_MAX_AGE", 24 * 60 * 60)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+_JOB_FILE = re.compile(r"^([0-9a-f]{32})\.")
+
+
+## Backends ##
+
+class SyncBackend(object):
+    """
+    Runs jobs immediately in the calling thread. Useful for tests.
+    """
+
+    def submit(self, func, *args):
+        func(*args)
+
+
+class ThreadBackend(object):
+    """
+    Runs jobs on a pool of daemon threads in this process, started on first use. Needs no external broker.
+
+    Each job"s database connection is closed when it finishes.
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args):
+        with self.lock:
+            if not self.threads:
+                for index in range(self.workers):
+                    thread = threading.Thread(target=self._work, name="djsonapi-jobs-%d" % index)
+                    thread.daemon = True
+                    thread.start()
+                    self.threads.append(thread)
+        self.jobs.put((func, args))
+
+    def _work(self):
+        while True:
+            func, args = self.jobs.get()
+            try:
+                func(*args)
+            except Exception:
+                log.error("Error running job", exc_info=True)
+            finally:
+                db.close_old_connections()
+                db.connection.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Return the shared instance of the backend configured by `DJSONAPI_JOB_BACKEND`.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_by_path(BACKEND)()
+        return _backend
+
+
+## Exports ##
+
+def _path(job_id, suffix):
+    return os.path.join(EXPORT_DIR, "%s%s" % (job_id, suffix))
+
+
+def export_path(job_id):
+    """
+    Return the path of the JSON file an export job writes.
+    """
+    return _path(job_id, ".json")
+
+
+def _write_status(job_id, state, **extra):
+    """
+    Atomically replace the status file of a job, so any process can read it.
+    """
+    extra.update(id=job_id, status=state)
+    temp_path = _path(job_id, ".status.tmp")
+    with open(temp_path, "w") as fp:
+        serial.dump(extra, fp)
+    os.rename(temp_path, _path(job_id, ".status.json"))
+
+
+def status(job_id):
+    """
+    Return the status dict of a job, or `None` if there is no such job.
+    """
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    try:
+        with open(_path(job_id, ".status.json")) as fp:
+            return serial.load(fp)
+    except IOError:
+        return None
+
+
+def start_export(items, mode=None, backend=None, **kwargs):
+    """
+    Queue a job that serializes `items` with `mode` into a JSON file, and return the job id.
+
+    QuerySets are evaluated by the job, in chunks of `CHUNK_SIZE` items.
+    Optional `kwargs` for the serializer function are passed down.
+    """
+    if not os.path.isdir(EXPORT_DIR):
+        os.makedirs(EXPORT_DIR)
+    job_id = uuid.uuid4().hex
+    _write_status(job_id, PENDING)
+    (backend or get_backend()).submit(run_export, job_id, items, mode, kwargs)
+    return job_id
+
+
+def run_export(job_id, items, mode, kwargs):
+    """
+    Serialize `items` into the export file of a job, updating its status.
+    """
+    _write_status(job_id, RUNNING)
+    temp_path = _path(job_id, ".tmp")
+    count = 0
+    try:
+        if hasattr(items, "iterator"):
+            items = items.iterator()
+        with open(temp_path, "w") as fp:
+            fp.write("[")
+            chunk = []
+            for data in serial.iserialize(items, mode=mode, **kwargs):
+                chunk.append(serial.dumps(data))
+                if len(chunk) >= CHUNK_SIZE:
+                    fp.write(("," if count else "") + ",".join(chunk))
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                fp.write(("," if count else "") + ",".join(chunk))
+                count += len(chunk)
+            fp.write("]")
+        os.rename(temp_path, export_path(job_id))
+    except Exception as exc:
+        log.error("Error running export job %s", job_id, exc_info=True)
+        _write_status(job_id, FAILED, error=str(exc) if settings.DEBUG else "Internal Server Error")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    else:
+        _write_status(job_id, DONE, count=count)
+
+
+def prune_exports(max_age=EXPORT_MAX_AGE):
+    """
+    Delete the files of the jobs that finished (or failed) more than `max_age` seconds ago, and return how many.
+
+    Export files are not deleted otherwise, so this should be run periodically.
+    """
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    expired = set()
+    names = os.listdir(EXPORT_DIR)
+    for name in names:
+        if not name.endswith(".status.json"):
+            continue
+        job_id = name[:-len(".status.json")]
+        try:
+            if os.path.getmtime(os.path.join(EXPORT_DIR, name)) >= cutoff:
+                continue
+        except OSError:
+            continue
+        job = status(job_id)
+        if job is not None and job["status"] in (DONE, FAILED):
+            expired.add(job_id)
+    for name in names:
+        match = _JOB_FILE.match(name)
+        if match and match.group(1) in expired:
+            try:
+                os.remove(os.path.join(EXPORT_DIR, name))
+            except OSError:
+                pass
+    return len(expired)
@@ -1 +1,47 @@
-# Stub required for tests
\ No newline at end of file
+from django.db import models
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+
+def model_label(model):
+    """
+    Return "app_label.ObjectName" for a model class or instance.
+    """
+    return ".".join((model._meta.app_label, model._meta.object_name))
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of an instance of a model registered with `track_deletions`,
+    so `api.changes_since` can tell clients what was deleted.
+    """
+    model = models.CharField(max_length=100)
+    object_pk = models.CharField(max_length=64)
+    deleted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        index_together = (("model", "deleted"),)
+
+
+def _record_tombstone(sender, instance, **kwargs):
+    """
+    post_delete handler that records a `Tombstone` for the deleted instance.
+    """
+    Tombstone.objects.create(model=model_label(sender), object_pk=str(instance.pk))
+
+
+def track_deletions(model):
+    """
+    Record a `Tombstone` whenever an instance of `model` is deleted.
+    """
+    post_delete.connect(_record_tombstone, sender=model, weak=False,
+                        dispatch_uid="djsonapi.tombstone.%s" % model_label(model))
+
+
+def prune_tombstones(before):
+    """
+    Delete the tombstones recorded before the datetime `before`.
+
+    Clients with a watermark older than that should re-download the whole collection.
+    """
+    Tombstone.objects.filter(deleted__lt=before).delete()
@@ -0,0 +1,159 @@
+import itertools
+import logging
+import sys
+import threading
+from functools import wraps
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+log = logging.getLogger("djsonapi")
+
+_state = threading.local()
+# tracemalloc is process wide, so only one request is profiled at a time
+_profiling_lock = threading.Lock()
+# Whether or not the warning that profiling is unavailable was logged
+_warned = []
+
+
+class MemoryProfile(object):
+    """
+    Memory used by each phase of one profiled request.
+
+    `phases` is a list of dicts with the phase name, the memory allocated during the phase (`allocated`),
+    the peak traced memory during the phase (`peak`, since the start of the request before Python 3.9),
+    and the `top` allocation sites of the phase as (location, size) pairs. Phases are "view", "serialize" and "encode".
+
+    Without `tracemalloc`, the peak resident set size of the process is used instead: `allocated` is how much
+    the peak grew during the phase, `peak` is the peak so far, and `top` is empty. This only shows phases
+    that raise the peak of the whole process, including other threads.
+    """
+
+    def __init__(self, view, top):
+        self.view = view
+        self.top = top
+        self.phases = []
+        self.phase = None
+        self._snapshot = None
+        self._current = 0
+
+    def start(self, phase):
+        """
+        Finish the current phase and start `phase`.
+        """
+        self.finish()
+        self.phase = phase
+        if tracemalloc is None:
+            self._current = _peak_rss()
+            return
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._current = tracemalloc.get_traced_memory()[0]
+        self._snapshot = tracemalloc.take_snapshot()
+
+    def finish(self):
+        """
+        Record the memory used by the current phase, if any.
+        """
+        if self.phase is None:
+            return
+        if tracemalloc is None:
+            current = peak = _peak_rss()
+            top = []
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(self._snapshot, "lineno")[:self.top]
+            top = [(str(stat.traceback), stat.size_diff) for stat in stats]
+        self.phases.append({
+            "phase": self.phase,
+            "allocated": current - self._current,
+            "peak": peak,
+            "top": top,
+        })
+        self.phase = None
+        self._snapshot = None
+
+    def summary(self):
+        return ", ".join("%s: %+d bytes (peak %d)" % (phase["phase"], phase["allocated"], phase["peak"])
+                         for phase in self.phases)
+
+
+def _peak_rss():
+    """
+    Return the peak resident set size of the process in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def mark(phase):
+    """
+    Start `phase` of the request being profiled in the current thread. Does nothing when not profiling.
+    """
+    profile = getattr(_state, "profile", None)
+    if profile is not None and profile.phase != phase:
+        profile.start(phase)
+
+
+def profile_memory(sample_rate=100, top=5, callback=None):
+    """
+    Profile the memory used by 1 in every `sample_rate` requests of a view with `tracemalloc`.
+
+    The peak memory and top allocation sites of each phase (the view itself, `serial.serialize`, and
+    encoding in `api.json_response`) are logged to the "djsonapi" logger, and passed to `callback`
+    as a `MemoryProfile` when given.
+
+    Without `tracemalloc` (before Python 3.4), the growth of the peak resident set size of the process
+    is measured instead. When neither is available, a warning is logged and the view is not profiled.
+    """
+
+    def decorator(func):
+        if tracemalloc is None and resource is None:
+            _warn_unavailable()
+            return func
+
+        view = "%s.%s" % (func.__module__, func.__name__)
+        counter = itertools.count()
+
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if next(counter) % sample_rate or not _profiling_lock.acquire(False):
+                return func(request, *args, **kwargs)
+            started = tracemalloc is not None and not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            profile = _state.profile = MemoryProfile(view, top)
+            try:
+                profile.start("view")
+                return func(request, *args, **kwargs)
+            finally:
+                profile.finish()
+                _state.profile = None
+                if started:
+                    tracemalloc.stop()
+                _profiling_lock.release()
+                log.info("Memory profile for %s: %s", view, profile.summary())
+                if callback is not None:
+                    callback(profile)
+
+        return wrapper
+
+    return decorator
+
+
+def _warn_unavailable():
+    """
+    Log once that memory profiling is not available.
+    """
+    if not _warned:
+        _warned.append(True)
+        log.warning("profile_memory needs tracemalloc or resource, so views are not profiled")
@@ -0,0 +1,121 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import get_cache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Methods whose views may read from a replica
+SAFE_METHODS = ("GET", "HEAD")
+# Methods after which the same user reads from the default database for a while
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Seconds that reads stay on the default database after a user writes
+STICKY_SECONDS = getattr(settings, "DJSONAPI_REPLICA_STICKY_SECONDS", 5)
+# Alias of the cache recording recent writers. It must be shared by every worker process,
+# or a user's next read may be handled by a worker that doesn't know about their write.
+REPLICA_CACHE = getattr(settings, "DJSONAPI_REPLICA_CACHE", "default")
+
+log = logging.getLogger("djsonapi")
+
+sticky_cache = get_cache(REPLICA_CACHE)
+
+_state = threading.local()
+
+
+class ReplicaRouter(object):
+    """
+    Database router that sends reads to the alias pinned by `required_method(..., read_replica=<alias>)`.
+
+    Everything else is left to the next router (or the default database).
+
+    settings.DATABASE_ROUTERS = ["djsonapi.routers.ReplicaRouter"]
+
+    Users read their own writes through the `DJSONAPI_REPLICA_CACHE` cache, which must be shared
+    between worker processes (e.g. memcached or a database cache): a warning is logged when it is
+    a per-process cache.
+    """
+
+    def __init__(self):
+        if isinstance(sticky_cache, (LocMemCache, DummyCache)):
+            log.warning("The %r cache used by ReplicaRouter is not shared between processes, "
+                        "so users may not read their own writes; set DJSONAPI_REPLICA_CACHE", REPLICA_CACHE)
+
+    def db_for_read(self, model, **hints):
+        return pinned_alias()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_syncdb(self, db, model):
+        return None
+
+
+def pinned_alias():
+    """
+    Return the database alias reads are pinned to in the current thread, if any.
+    """
+    return getattr(_state, "alias", None)
+
+
+@contextmanager
+def pin(alias):
+    """
+    Pin reads in the current thread to database `alias` for the duration of the block.
+    """
+    previous = pinned_alias()
+    _state.alias = alias
+    try:
+        yield
+    finally:
+        _state.alias = previous
+
+
+def _sticky_key(request):
+    """
+    Return the cache key identifying the writer of `request`, or `None` if they can't be identified.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated():
+        return "djsonapi.sticky.user.%s" % user.pk
+    session = getattr(request, "session", None)
+    if session is not None and session.session_key:
+        return "djsonapi.sticky.session.%s" % session.session_key
+    return None
+
+
+def record_write(request):
+    """
+    Keep reads for the writer of `request` on the default database for `STICKY_SECONDS`.
+    """
+    key = _sticky_key(request)
+    if key is not None:
+        sticky_cache.set(key, True, STICKY_SECONDS)
+
+
+def recently_wrote(request):
+    """
+    Return whether or not the writer of `request` wrote within the last `STICKY_SECONDS`.
+    """
+    key = _sticky_key(request)
+    return key is not None and sticky_cache.get(key, False)
+
+
+@contextmanager
+def route_request(request, alias):
+    """
+    Pin reads to replica `alias` while handling a safe request, unless its user recently wrote.
+    Write requests are recorded whether or not their view reads from a replica, so users read
+    their own writes from other views.
+    """
+    if alias and request.method in SAFE_METHODS and not recently_wrote(request):
+        with pin(alias):
+            yield
+    else:
+        if request.method in WRITE_METHODS:
+            record_write(request)
+        yield
@@ -1,8 +1,101 @@
+import datetime
+import decimal
+import inspect
+import io
 import itertools
 import json
+import keyword
+import operator
+import re
+import threading
+from contextlib import contextmanager
 
 from django.conf import settings
+from django.core.exceptions import FieldError
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.fields import FieldDoesNotExist
+from django.utils import six
+
+from djsonapi import profiling
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+    from cbor2 import encoder as cbor2_encoder
+except ImportError:
+    cbor2 = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+## Encoder Registry
+
+# type => encoder function registration map
+ENCODER_MAP = {}
+# type => encoder function (or None) resolved through the type"s MRO
+_encoder_cache = {}
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def register_encoder(klass, func):
+    """
+    Register `func` to encode instances of `klass` (and its subclasses) into something encodable.
+
+    Used by `dumps` and the binary encodings for objects they can"t encode natively.
+
+    e.g.
+
+    register_encoder(Decimal, float)
+    register_encoder(Report, serialize)  # encode reports with their default-mode serializer
+    """
+    ENCODER_MAP[klass] = func
+    _encoder_cache.clear()
+
+
+def _find_encoder(klass):
+    """
+    Return the registered encoder for the closest class in the MRO of `klass`, or `None`.
+    """
+    for base in inspect.getmro(klass):
+        try:
+            return ENCODER_MAP[base]
+        except KeyError:
+            pass
+    return None
+
+
+def encode_default(obj):
+    """
+    Encode an object that isn"t natively encodable.
+
+    Registered encoders are tried first, then Django"s encoder for date, datetime, and Decimal objects.
+    Raises TypeError for anything else.
+    """
+    klass = obj.__class__
+    try:
+        func = _encoder_cache[klass]
+    except KeyError:
+        func = _encoder_cache[klass] = _find_encoder(klass)
+    if func is not None:
+        return func(obj)
+    return _django_encoder.default(obj)
+
+
+class JSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder that uses `encode_default` for objects that aren"t natively encodable.
+    """
+
+    def default(self, obj):
+        return encode_default(obj)
 
 
 ## JSON Methods
@@ -11,11 +104,11 @@ def dump(obj, fp, **kwargs):
     """
     Write the JSON serialization of `obj` to `fp`.
 
-    Uses Django"s encoder in order to automatically encode date, datetime, and Decimal objects.
+    Uses `JSONEncoder` in order to automatically encode registered types, and date, datetime, and Decimal objects.
 
     `args` and `kwargs` are the same as a regular json.dumps call, except that `kwargs["cls"]` is modified.
     """
-    kwargs["cls"] = DjangoJSONEncoder
+    kwargs["cls"] = JSONEncoder
     return json.dump(obj, fp, **kwargs)
 
 
@@ -23,11 +116,11 @@ def dumps(obj, **kwargs):
     """
     Convert python objects to JSON.
 
-    Uses Django"s encoder in order to automatically encode date, datetime, and Decimal objects.
+    Uses `JSONEncoder` in order to automatically encode registered types, and date, datetime, and Decimal objects.
 
     `args` and `kwargs` are the same as a regular json.dumps call, except that `kwargs["cls"]` is modified.
     """
-    kwargs["cls"] = DjangoJSONEncoder
+    kwargs["cls"] = JSONEncoder
     return json.dumps(obj, **kwargs)
 
 # Shortcut for json.load
@@ -36,10 +129,176 @@ load = json.load
 loads = json.loads
 
 
+def dumpb(obj, **kwargs):
+    """
+    Convert python objects to UTF-8 encoded JSON bytes.
+
+    `kwargs` are the same as for `dumps`.
+    """
+    content = dumps(obj, **kwargs)
+    if isinstance(content, six.text_type):
+        content = content.encode("utf-8")
+    return content
+
+
+class Encoded(object):
+    """
+    A value that is already encoded as JSON bytes.
+
+    `api.json_response` writes the bytes of top-level body values into the response as-is, so large or
+    cached values are not encoded again. Anywhere else, the value is decoded and encoded normally.
+
+    e.g.
+
+    reports = serial.Encoded(cache.get("reports_json"))
+    return api.ok(reports=reports)
+    """
+    __slots__ = ("content",)
+
+    def __init__(self, content):
+        self.content = content
+
+
+register_encoder(Encoded, lambda value: loads(value.content))
+
+
+## Binary Encodings
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+CBOR_CONTENT_TYPE = "application/cbor"
+
+
+def msgpack_dumps(obj):
+    """
+    Convert python objects to MessagePack.
+
+    Registered types, and date, datetime, and Decimal objects are encoded the same as `dumps`.
+    """
+    return msgpack.packb(obj, default=encode_default, use_bin_type=True)
+
+
+def msgpack_loads(data):
+    """
+    Convert MessagePack to python objects.
+    """
+    return msgpack.unpackb(data, raw=False)
+
+
+# Types CBOR has tags for, but that are encoded the same as `dumps` instead
+_CBOR_DEFAULT_TYPES = (datetime.date, datetime.datetime, decimal.Decimal, ("decimal", "Decimal"))
+
+
+def cbor_dumps(obj):
+    """
+    Convert python objects to CBOR.
+
+    Registered types, and date, datetime, and Decimal objects are encoded the same as `dumps`,
+    rather than with CBOR's own tags (which can't encode naive datetimes).
+    """
+    fp = io.BytesIO()
+    encoder = cbor2_encoder.CBOREncoder(fp, default=_cbor_default)
+    for klass in _CBOR_DEFAULT_TYPES:
+        encoder._encoders.pop(klass, None)
+    encoder.encode(obj)
+    return fp.getvalue()
+
+
+def _cbor_default(encoder, value):
+    encoder.encode(encode_default(value))
+
+
+def cbor_loads(data):
+    """
+    Convert CBOR to python objects.
+    """
+    return cbor2.loads(data)
+
+
+# content type => (dumps, loads) for every available encoding
+ENCODINGS = {
+    JSON_CONTENT_TYPE: (dumps, loads),
+}
+if msgpack is not None:
+    ENCODINGS[MSGPACK_CONTENT_TYPE] = (msgpack_dumps, msgpack_loads)
+    ENCODINGS["application/x-msgpack"] = (msgpack_dumps, msgpack_loads)
+if cbor2 is not None:
+    ENCODINGS[CBOR_CONTENT_TYPE] = (cbor_dumps, cbor_loads)
+
+_state = threading.local()
+
+
+def negotiate(accept):
+    """
+    Return the content type in an HTTP Accept header that has an available encoding and the highest
+    quality (`q`), the first listed among equals. Content types with `q=0` are not acceptable.
+
+    Defaults to JSON when nothing matches.
+    """
+    best, best_quality = JSON_CONTENT_TYPE, 0
+    if accept:
+        for media_range in accept.split(","):
+            params = media_range.split(";")
+            content_type = params[0].strip().lower()
+            if content_type not in ENCODINGS:
+                continue
+            quality = 1.0
+            for param in params[1:]:
+                name, _, value = param.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0
+            if quality > best_quality:
+                best, best_quality = content_type, quality
+    return best
+
+
+def active_content_type():
+    """
+    Return the content type responses should be encoded as in the current thread.
+    """
+    return getattr(_state, "content_type", JSON_CONTENT_TYPE)
+
+
+@contextmanager
+def use_content_type(content_type):
+    """
+    Encode responses created in the current thread as `content_type` for the duration of the block.
+    """
+    previous = active_content_type()
+    _state.content_type = content_type
+    try:
+        yield
+    finally:
+        _state.content_type = previous
+
+
+def dumps_as(content_type, obj):
+    """
+    Encode python objects with the encoding registered for `content_type`.
+    """
+    return ENCODINGS[content_type][0](obj)
+
+
+def loads_as(content_type, data):
+    """
+    Decode data with the encoding registered for `content_type`, ignoring any parameters such as charset.
+
+    Unknown content types are decoded as JSON.
+    """
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    encoding = ENCODINGS.get(content_type, ENCODINGS[JSON_CONTENT_TYPE])
+    return encoding[1](data)
+
+
 ## Serializer Methods
 
 # (klass, mode) => serializer_func registration map
 SERIAL_MAP = {}
+# (klass, mode) combos whose serializer function accepts a `context` argument
+CONTEXT_SERIALIZERS = set()
 # Whether or not to, by default, include object debug information.
 SERIALIZE_DEBUG_DATA = settings.DEBUG
 
@@ -50,6 +309,71 @@ class NoSerializerFound(Exception):
     """
 
 
+class SerialContext(object):
+    """
+    State shared by every serializer during one top-level `serialize` call, or one request.
+
+    `identity` maps (klass, mode, pk, kwargs) to data that was already serialized, so repeated objects
+    are only serialized once. It is `None` when `track_identity` is `False`, which keeps memory
+    constant when streaming. `memo` caches computed values, such as permission checks.
+
+    The identity map assumes objects are not changed while the context is used: an object saved
+    after being serialized is still serialized with its old data. The data first returned for an
+    object is what is stored, so it should not be modified; later lookups return copies.
+
+    Serializers that declare a `context` argument receive it:
+
+    ```
+    @serializer(Report)
+    def serialize_report(obj, context=None, **kwargs):
+        data = serialize_model(obj, ("title",))
+        data["author"] = serialize(obj.author, mode="public", context=context)
+        data["can_edit"] = context.memo(("can_edit", obj.author_id), can_edit, obj.author_id)
+        return data
+    ```
+    """
+
+    def __init__(self, track_identity=True):
+        self.identity = {} if track_identity else None
+        self.memo_cache = {}
+
+    @classmethod
+    def for_request(cls, request, track_identity=False):
+        """
+        Return the context shared by every serialization done while handling `request`.
+
+        Its identity map is off unless `track_identity` is `True` when it is first created,
+        since views commonly save objects between serializations.
+        """
+        try:
+            return request._djsonapi_serial_context
+        except AttributeError:
+            context = request._djsonapi_serial_context = cls(track_identity=track_identity)
+            return context
+
+    def memo(self, key, func, *args, **kwargs):
+        """
+        Return `func(*args, **kwargs)`, computing it only once per `key` in this context.
+        """
+        try:
+            return self.memo_cache[key]
+        except KeyError:
+            value = self.memo_cache[key] = func(*args, **kwargs)
+            return value
+
+
+def _accepts_context(func):
+    """
+    Return whether or not `func` declares a `context` argument.
+    """
+    getargspec = getattr(inspect, "getfullargspec", None) or inspect.getargspec
+    try:
+        spec = getargspec(func)
+    except TypeError:
+        return False
+    return "context" in spec.args or "context" in getattr(spec, "kwonlyargs", ())
+
+
 def _get_serialize_func(klass, mode):
     """
     Return the registered serializer function for the given (class, mode) combo
@@ -64,14 +388,36 @@ def _get_serialize_func(klass, mode):
         return serializer_func
 
 
-def _serialize_item(model_instance, mode, **kwargs):
+def _serialize_item(model_instance, mode, context, **kwargs):
     """
     Serialize an individual item.
 
+    Items with a primary key are looked up in, and added to, the identity map of `context`.
+
     Optional `kwargs` for the serializer function are passed down.
     """
-    serializer_func = _get_serialize_func(model_instance.__class__, mode)
-    return serializer_func(model_instance, **kwargs)
+    klass = model_instance.__class__
+    identity = context.identity
+    pk = getattr(model_instance, "pk", None) if identity is not None else None
+    if pk is not None:
+        key = (klass, mode, pk, tuple(sorted(kwargs.items())))
+        try:
+            return dict(identity[key])
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable serializer kwargs
+            pk = None
+
+    serializer_func = _get_serialize_func(klass, mode)
+    if (klass, mode) in CONTEXT_SERIALIZERS:
+        data = serializer_func(model_instance, context=context, **kwargs)
+    else:
+        data = serializer_func(model_instance, **kwargs)
+
+    if pk is not None:
+        identity[key] = data
+    return data
 
 
 def serializer(klass, mode=None):
@@ -79,6 +425,7 @@ def serializer(klass, mode=None):
     Decorator to register a function as a serializer for a given (class, mode) combo.
 
     The function should accept optional keyword arguments, but is not required.
+    If it declares a `context` argument, it receives the `SerialContext` of the serialization.
 
     i.e.
 
@@ -107,39 +454,111 @@ def serializer(klass, mode=None):
     def decorator(func):
         # Register the serializer function for the combination of klass and mode
         SERIAL_MAP[(klass, mode)] = func
+        if _accepts_context(func):
+            CONTEXT_SERIALIZERS.add((klass, mode))
+        else:
+            CONTEXT_SERIALIZERS.discard((klass, mode))
         # Return the function unmodified
         return func
 
     return decorator
 
 
-def serialize(items, mode=None, **kwargs):
+def serialize(items, mode=None, context=None, **kwargs):
     """
     Perform object serialization with a given mode.
 
     If a sequence of items is passed in, each item is serialized
     individually with the given mode and a list of data is returned.
 
+    A new `SerialContext` without an identity map is used unless one is given, e.g. to share it across a request,
+    or `SerialContext()` to serialize objects repeated across the items only once.
+
     Optional `kwargs` for the serializer function are passed down.
     """
+    profiling.mark("serialize")
+    if _is_vectorized(items, mode):
+        return list(_iserialize_vectorized(items, mode))
+    if context is None:
+        context = SerialContext(track_identity=False)
     if hasattr(items, "__len__"):
         # For each item, serialize that mofo.
-        return [_serialize_item(item, mode, **kwargs) for item in items]
+        return [_serialize_item(item, mode, context, **kwargs) for item in items]
     else:
         # Serialize that mofo.
-        return _serialize_item(items, mode, **kwargs)
+        return _serialize_item(items, mode, context, **kwargs)
 
 
-def iserialize(items, mode=None, **kwargs):
+def iserialize(items, mode=None, context=None, **kwargs):
     """
     Perform object serialization on a list of objects, returning a generator, should the need arise.
 
+    A new `SerialContext` without an identity map is used unless one is given,
+    so memory does not grow with the number of items.
+
     Optional `kwargs` for the serializer function are passed down.
     """
-    mappable = lambda item: _serialize_item(item, mode, **kwargs)
+    profiling.mark("serialize")
+    if _is_vectorized(items, mode):
+        return _iserialize_vectorized(items, mode)
+    if context is None:
+        context = SerialContext(track_identity=False)
+    mappable = lambda item: _serialize_item(item, mode, context, **kwargs)
     return itertools.imap(mappable, items)
 
 
+def serialize_compound(items, mode=None, include=None, context=None, **kwargs):
+    """
+    Serialize items as a compound document, returning `(data, included)`.
+
+    `include` maps the names of foreign keys on the items to the mode their related objects are serialized with.
+    In each item"s data, those relations are replaced by the related object"s primary key, and every distinct
+    related object is fetched in one query per related model and serialized once into `included`,
+    keyed by model label and then primary key.
+
+    e.g.
+
+    reports, included = serialize_compound(Report.objects.all(), include={"author": "public"})
+
+    reports == [{"title": "...", "author": 1}, {"title": "...", "author": 1}]
+    included == {"auth.User": {"1": {"name": "..."}}}
+
+    Serializers for the items should not serialize the included relations themselves.
+    Optional `kwargs` for the serializer functions are passed down.
+    """
+    profiling.mark("serialize")
+    if context is None:
+        context = SerialContext(track_identity=False)
+    single = not hasattr(items, "__len__")
+    if single:
+        items = [items]
+    data = [_serialize_item(item, mode, context, **kwargs) for item in items]
+
+    # related model => (mode, set of primary keys)
+    related = {}
+    for name, related_mode in (include or {}).items():
+        fields = {}
+        for item, bag in zip(items, data):
+            klass = item.__class__
+            try:
+                field = fields[klass]
+            except KeyError:
+                field = fields[klass] = klass._meta.get_field(name)
+            related_pk = getattr(item, field.attname)
+            bag[name] = related_pk
+            if related_pk is not None:
+                related.setdefault(field.rel.to, (related_mode, set()))[1].add(related_pk)
+
+    included = {}
+    for related_model, (related_mode, pks) in related.items():
+        label = ".".join((related_model._meta.app_label, related_model._meta.object_name))
+        objects = related_model._default_manager.in_bulk(pks)
+        included[label] = dict((str(pk), _serialize_item(obj, related_mode, context, **kwargs))
+                               for pk, obj in objects.items())
+
+    return data[0] if single else data, included
+
+
 def serialize_fields(obj, fields):
     """
     Put the value of each attribute name in `fields` into a dict and return the dict.
@@ -187,6 +606,369 @@ def serialize_model(obj, fields=None, debug_fields=SERIALIZE_DEBUG_DATA):
     return bag
 
 
+## Compiled Serializers
+
+# (klass, mode, fields, debug_fields) => generated serializer function
+COMPILED_MAP = {}
+# (klass, fields) => generated row function
+COMPILED_ROW_MAP = {}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _compile_accessor(klass, name, var):
+    """
+    Return the source lines that load attribute `name` from `obj` into `var`.
+
+    Methods defined on the class are called directly, anything else is checked with `callable` per object.
+    """
+    if _IDENTIFIER.match(name) and not keyword.iskeyword(name):
+        expr = "obj.%s" % name
+    else:
+        expr = "getattr(obj, %r)" % name
+    if inspect.isroutine(getattr(klass, name, None)):
+        return ["    %s = %s()" % (var, expr)]
+    return [
+        "    %s = %s" % (var, expr),
+        "    if callable(%s):" % var,
+        "        %s = %s()" % (var, var),
+    ]
+
+
+def compile_serializer(klass, fields=None, mode=None, debug_fields=SERIALIZE_DEBUG_DATA):
+    """
+    Generate a straight-line serializer function for `klass`, cached per (klass, mode, fields, debug_fields).
+
+    The generated function produces the same output as `serialize_model` (or `serialize_fields` for
+    classes that are not django models) without looping over the field names for every object.
+
+    e.g.
+
+    serialize_report = compile_serializer(Report, ("title", "message"))
+
+    serialize_report(report) == {"title": report.title, "message": report.message}
+    """
+    is_model = hasattr(klass, "_meta")
+    if not fields and is_model:
+        fields = [field for field in klass._meta.get_all_field_names() if "password" not in field]
+    fields = tuple(fields or ())
+    debug_fields = bool(debug_fields and is_model)
+
+    key = (klass, mode, fields, debug_fields)
+    try:
+        return COMPILED_MAP[key]
+    except KeyError:
+        pass
+
+    func_name = "serialize_%s_%s" % (klass.__name__, mode or "default")
+    if not _IDENTIFIER.match(func_name):
+        func_name = "serialize_compiled"
+
+    lines = ["def %s(obj, **kwargs):" % func_name]
+    items = []
+    for index, name in enumerate(fields):
+        var = "v%d" % index
+        lines.extend(_compile_accessor(klass, name, var))
+        items.append("%r: %s" % (name, var))
+    if debug_fields:
+        items.append("'_debug_pk': obj.pk")
+        items.append("'_debug_model': %r" % ".".join((klass._meta.app_label, klass._meta.object_name)))
+    lines.append("    return {%s}" % ", ".join(items))
+
+    func = _exec_function(func_name, lines)
+    COMPILED_MAP[key] = func
+    return func
+
+
+def compile_row(klass, fields):
+    """
+    Generate a function returning a tuple of the values of `fields` for an instance of `klass`.
+
+    Callables are handled the same way as in `serialize_fields`. Used by `serialize_columns`.
+
+    For models, `fields` must be concrete fields, which are read the way `values_list` reads them:
+    foreign keys give the related primary key. Other names raise `FieldError`.
+    """
+    fields = tuple(fields)
+    key = (klass, fields)
+    try:
+        return COMPILED_ROW_MAP[key]
+    except KeyError:
+        pass
+    names = _concrete_attnames(klass, fields) if hasattr(klass, "_meta") else fields
+
+    func_name = "row_%s" % klass.__name__
+    if not _IDENTIFIER.match(func_name):
+        func_name = "row_compiled"
+
+    lines = ["def %s(obj):" % func_name]
+    values = []
+    for index, name in enumerate(names):
+        var = "v%d" % index
+        lines.extend(_compile_accessor(klass, name, var))
+        values.append(var)
+    lines.append("    return (%s)" % "".join(value + ", " for value in values))
+
+    func = _exec_function(func_name, lines)
+    COMPILED_ROW_MAP[key] = func
+    return func
+
+
+def _concrete_attnames(model, fields):
+    """
+    Return the attribute names of the concrete fields of `model` named by `fields`, raising `FieldError` otherwise.
+    """
+    opts = model._meta
+    attnames = []
+    for name in fields:
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name, many_to_many=False)
+        except FieldDoesNotExist:
+            raise FieldError("%r is not a concrete field of %s" % (name, opts.object_name))
+        attnames.append(field.attname)
+    return attnames
+
+
+def _exec_function(func_name, lines):
+    """
+    Execute generated source `lines` and return the function named `func_name`.
+    """
+    source = "\n".join(lines) + "\n"
+    namespace = {}
+    exec(compile(source, "<djsonapi.serial %s>" % func_name, "exec"), namespace)
+    func = namespace[func_name]
+    func.source = source
+    return func
+
+
+def register_compiled(klass, fields=None, mode=None, debug_fields=SERIALIZE_DEBUG_DATA):
+    """
+    Generate a serializer with `compile_serializer` and register it for the given (class, mode) combo.
+
+    i.e.
+
+    ```
+    serialize_report = register_compiled(Report, ("title", "message"), mode="limited")
+    ```
+
+    Which is equivalent to, but faster than:
+
+    ```
+    @serializer(Report, mode="limited")
+    def serialize_report(obj, **kwargs):
+        return serialize_model(obj, ("title", "message"))
+    ```
+    """
+    func = compile_serializer(klass, fields, mode=mode, debug_fields=debug_fields)
+    SERIAL_MAP[(klass, mode)] = func
+    CONTEXT_SERIALIZERS.discard((klass, mode))
+    return func
+
+
+## Columnar Layout
+
+def serialize_columns(items, fields):
+    """
+    Serialize a sequence of items into a compact columnar layout:
+
+    {"fields": ["title", "status"], "rows": [["first", 1], ["second", 2]]}
 
+    QuerySets are read with `values_list` so no model instances or per-row dicts are built.
+    Other objects have their `fields` read with a generated function from `compile_row`.
+    For models, both give the same rows: `fields` must be concrete fields, and foreign keys give the related primary key.
+    """
+    fields = tuple(fields)
+    if hasattr(items, "values_list"):
+        _concrete_attnames(items.model, fields)
+        rows = list(items.values_list(*fields))
+    else:
+        row_funcs = {}
+        rows = []
+        for item in items:
+            klass = item.__class__
+            try:
+                row_func = row_funcs[klass]
+            except KeyError:
+                row_func = row_funcs[klass] = compile_row(klass, fields)
+            rows.append(row_func(item))
+    return {
+        "fields": fields,
+        "rows": rows,
+    }
+
+
+## Vectorized Serializers
+
+# (klass, mode) => (fields, computed, chunk_size) for serializers registered with `vectorized`
+VECTORIZED_MAP = {}
+
+
+_div = getattr(operator, "div", operator.truediv)
+
+
+class Column(list):
+    """
+    A column of values with element-wise arithmetic, passed to computed fields when NumPy is not installed.
+
+    e.g.
+
+    Column([1, 2]) * 2 + Column([3, 4]) == [5, 8]
+    """
+
+    def _apply(self, other, op):
+        if isinstance(other, (list, tuple)):
+            return Column(op(value, other_value) for value, other_value in zip(self, other))
+        return Column(op(value, other) for value in self)
+
+    def _rapply(self, other, op):
+        return Column(op(other, value) for value in self)
+
+    def __add__(self, other):
+        return self._apply(other, operator.add)
+
+    def __radd__(self, other):
+        return self._rapply(other, operator.add)
+
+    def __sub__(self, other):
+        return self._apply(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._rapply(other, operator.sub)
+
+    def __mul__(self, other):
+        return self._apply(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._rapply(other, operator.mul)
+
+    def __truediv__(self, other):
+        return self._apply(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._rapply(other, operator.truediv)
+
+    # Python 2 division without `from __future__ import division`: floor division of integers, like NumPy
+    def __div__(self, other):
+        return self._apply(other, _div)
+
+    def __rdiv__(self, other):
+        return self._rapply(other, _div)
+
+    def __floordiv__(self, other):
+        return self._apply(other, operator.floordiv)
+
+    def __mod__(self, other):
+        return self._apply(other, operator.mod)
+
+    def __pow__(self, other):
+        return self._apply(other, operator.pow)
+
+    def __neg__(self):
+        return Column(-value for value in self)
+
+    def __abs__(self):
+        return Column(abs(value) for value in self)
+
+    __iadd__ = __add__
+    __imul__ = __mul__
+
+
+def _column(values):
+    """
+    Return a column of values, as a NumPy array when NumPy is installed.
+    """
+    if numpy is not None:
+        return numpy.array(values)
+    return Column(values)
+
+
+def _column_values(values, length):
+    """
+    Return the result of a computed field as a list of python values, repeating scalars.
+    """
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    if not isinstance(values, (list, tuple)):
+        return [values] * length
+    return values
+
+
+def _vectorized_rows(fields, computed, rows):
+    """
+    Build the data of a chunk of rows, evaluating each computed field once over the whole chunk.
+
+    Rows with a NULL (`None`) field are left out of the columns, and their computed fields are `None`.
+    """
+    complete = [row for row in rows if None not in row]
+    if complete and computed:
+        columns = dict((name, _column(values)) for name, values in zip(fields, zip(*complete)))
+        computed_values = [(name, iter(_column_values(func(columns), len(complete))))
+                           for name, func in computed.items()]
+    else:
+        computed_values = [(name, None) for name in computed]
+    has_nulls = len(complete) < len(rows)
+    chunk = []
+    for row in rows:
+        data = dict(zip(fields, row))
+        incomplete = has_nulls and None in row
+        for name, values in computed_values:
+            data[name] = None if incomplete or values is None else next(values)
+        chunk.append(data)
+    return chunk
+
+
+def _is_vectorized(items, mode):
+    """
+    Return whether or not `items` is a QuerySet of a model with a vectorized serializer for `mode`.
+    """
+    return hasattr(items, "values_list") and (items.model, mode) in VECTORIZED_MAP
+
+
+def _iserialize_vectorized(queryset, mode):
+    """
+    Generate the data of a QuerySet with a vectorized serializer, reading rows in chunks with `values_list`.
+    """
+    fields, computed, chunk_size = VECTORIZED_MAP[(queryset.model, mode)]
+    rows = []
+    for row in queryset.values_list(*fields).iterator():
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            for data in _vectorized_rows(fields, computed, rows):
+                yield data
+            rows = []
+    if rows:
+        for data in _vectorized_rows(fields, computed, rows):
+            yield data
+
+
+def vectorized(klass, fields, computed=None, mode=None, chunk_size=1000):
+    """
+    Register a serializer for the given (class, mode) combo whose computed fields are evaluated over columns.
+
+    `computed` maps field names to functions that accept a dict of field name => column of values, and return
+    a column (or a single value) for the computed field. Columns are NumPy arrays when NumPy is installed,
+    and `Column` lists with element-wise arithmetic otherwise, which divide the same way.
+    Rows with a NULL in any of `fields` are left out of the columns, and their computed fields are `None`.
+
+    Serializing a QuerySet of `klass` reads `fields` with `values_list` in chunks of `chunk_size` rows,
+    and evaluates each computed field once per chunk. `fields` must be concrete field names.
+
+    i.e.
+
+    ```
+    vectorized(Trip, ("distance", "duration"), {
+        "speed": lambda columns: columns["distance"] / columns["duration"],
+    }, mode="stats")
+    ```
+    """
+    fields = tuple(fields)
+    computed = computed or {}
+    VECTORIZED_MAP[(klass, mode)] = (fields, computed, chunk_size)
+    row = compile_row(klass, fields)
 
+    def serialize_vectorized(obj, **kwargs):
+        return _vectorized_rows(fields, computed, [row(obj)])[0]
 
+    SERIAL_MAP[(klass, mode)] = serialize_vectorized
+    CONTEXT_SERIALIZERS.discard((klass, mode))
+    return serialize_vectorized
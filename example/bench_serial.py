@@ -0,0 +1,53 @@
+"""
+Compare the per-object speed of the serializer helpers.
+
+Run with:
+
+    python -m example.bench_serial
+"""
+import os
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example.settings")
+
+from djsonapi import serial
+
+
+class Row(object):
+    title = "title"
+
+    def __init__(self, index):
+        self.index = index
+        self.message = "message %d" % index
+        self.status = index % 7
+
+    def score(self):
+        return self.index * 2
+
+
+FIELDS = ("title", "message", "status", "index", "score")
+
+
+def main(number=100000):
+    rows = [Row(index) for index in range(1000)]
+    compiled = serial.compile_serializer(Row, FIELDS)
+
+    def run_fields():
+        for row in rows:
+            serial.serialize_fields(row, FIELDS)
+
+    def run_compiled():
+        for row in rows:
+            compiled(row)
+
+    repeat = max(1, number // len(rows))
+    fields_time = min(timeit.repeat(run_fields, number=repeat, repeat=3))
+    compiled_time = min(timeit.repeat(run_compiled, number=repeat, repeat=3))
+
+    print("serialize_fields:    %.3fs for %d objects" % (fields_time, repeat * len(rows)))
+    print("compile_serializer:  %.3fs for %d objects" % (compiled_time, repeat * len(rows)))
+    print("speedup:             %.2fx" % (fields_time / compiled_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Load test the example project in-process, to see how djsonapi views scale with concurrent clients.
+
+Boots `example.wsgi.application` on a threaded WSGI server backed by a temporary SQLite database,
+drives concurrent clients against the testapp views, and reports throughput and latency percentiles
+for each concurrency level.
+
+Run with:
+
+    python -m example.loadtest --concurrency 1,2,4,8 --requests 500 --output loadtest.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    from httplib import HTTPConnection
+
+try:
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from SocketServer import ThreadingMixIn
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example.settings")
+
+# (name, method, path, body, expected status)
+SCENARIOS = (
+    ("get_home", "GET", "/api/", None, 200),
+    ("post_report", "POST", "/api/report/", {"title": "load", "message": "test", "status": 1}, 200),
+    ("get_report", "GET", "/api/report/", None, 200),
+    ("get_report_msgpack", "GET", "/api/report/", None, 200),
+    ("error_404", "GET", "/api/missing/", None, 404),
+    ("error_405", "DELETE", "/api/report/", None, 405),
+)
+
+
+class ThreadedWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def setup_database(directory):
+    """
+    Point every database alias at a fresh SQLite file in `directory` and create the tables.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+
+    name = os.path.join(directory, "loadtest.sqlite3")
+    for database in settings.DATABASES.values():
+        database["NAME"] = name
+    call_command("syncdb", interactive=False, verbosity=0)
+
+
+def start_server():
+    """
+    Start the example WSGI application on a free port in a background thread and return the server.
+    """
+    from example.wsgi import application
+
+    server = make_server("127.0.0.1", 0, application, server_class=ThreadedWSGIServer, handler_class=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def request(port, scenario):
+    """
+    Perform one request of `scenario` and return (latency in seconds, whether the status was as expected).
+    """
+    name, method, path, body, expected = scenario
+    headers = {"Content-Type": "application/json"}
+    if name.endswith("_msgpack"):
+        headers["Accept"] = "application/msgpack"
+    content = json.dumps(body) if body is not None else None
+
+    start = time.time()
+    connection = HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        connection.request(method, path, content, headers)
+        response = connection.getresponse()
+        response.read()
+        ok = response.status == expected
+    except Exception:
+        ok = False
+    finally:
+        connection.close()
+    return time.time() - start, ok
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank `percent` percentile of sorted `values`.
+    """
+    if not values:
+        return None
+    index = max(0, int(round(percent / 100.0 * len(values))) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def run_level(port, concurrency, requests, scenarios):
+    """
+    Run `requests` requests spread over `concurrency` client threads, cycling through `scenarios`.
+    """
+    latencies = dict((scenario[0], []) for scenario in scenarios)
+    errors = dict((scenario[0], 0) for scenario in scenarios)
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            scenario = scenarios[index % len(scenarios)]
+            latency, ok = request(port, scenario)
+            with lock:
+                latencies[scenario[0]].append(latency)
+                if not ok:
+                    errors[scenario[0]] += 1
+
+    start = time.time()
+    threads = [threading.Thread(target=client) for x in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.time() - start
+
+    everything = sorted(latency for values in latencies.values() for latency in values)
+    result = summarize(everything, sum(errors.values()))
+    result.update(concurrency=concurrency, duration=duration, throughput=len(everything) / duration, scenarios={})
+    for name, values in latencies.items():
+        result["scenarios"][name] = summarize(sorted(values), errors[name])
+    return result
+
+
+def summarize(latencies, errors):
+    """
+    Summarize sorted latencies as a count, error count, and percentiles in milliseconds.
+    """
+    summary = {"requests": len(latencies), "errors": errors}
+    for percent in (50, 90, 99):
+        value = percentile(latencies, percent)
+        summary["p%d_ms" % percent] = value * 1000 if value is not None else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        help="comma separated numbers of concurrent clients (default: 1,2,4,8)")
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level (default: 500)")
+    parser.add_argument("--scenarios", default=",".join(scenario[0] for scenario in SCENARIOS),
+                        help="comma separated scenarios to run (default: all)")
+    parser.add_argument("--output", default="loadtest.json", help="file to save the results to as JSON")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    names = args.scenarios.split(",")
+    scenarios = [scenario for scenario in SCENARIOS if scenario[0] in names]
+
+    directory = tempfile.mkdtemp()
+    try:
+        setup_database(directory)
+        server = start_server()
+        port = server.server_address[1]
+        # warm up
+        for scenario in scenarios:
+            request(port, scenario)
+
+        results = []
+        print("%11s %10s %8s %8s %8s %8s" % ("concurrency", "req/s", "p50 ms", "p90 ms", "p99 ms", "errors"))
+        for concurrency in levels:
+            result = run_level(port, concurrency, args.requests, scenarios)
+            results.append(result)
+            print("%11d %10.1f %8.2f %8.2f %8.2f %8d" % (concurrency, result["throughput"], result["p50_ms"],
+                                                          result["p90_ms"], result["p99_ms"], result["errors"]))
+        server.shutdown()
+    finally:
+        shutil.rmtree(directory)
+
+    with open(args.output, "w") as fp:
+        json.dump({"requests": args.requests, "levels": results}, fp, indent=2, sort_keys=True)
+    print("Results saved to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
+from django.core.validators import MinValueValidator
 from django.db import models
 
+from djsonapi.models import track_deletions
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+
 class Report(models.Model):
     title = models.CharField(max_length=100, default='untitled')
     message = models.TextField(max_length=2048, default='')
-    status = models.IntegerField(default=7)
\ No newline at end of file
+    status = models.IntegerField(default=7, validators=[MinValueValidator(0)])
+    author = models.ForeignKey(Author, null=True, blank=True)
+    updated = models.DateTimeField(auto_now=True)
+
+
+track_deletions(Report)
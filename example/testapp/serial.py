@@ -4,14 +4,16 @@ from example.testapp import models
 
 
 
-@serial.serializer(models.Report, mode="limited")
-def serialize_report_limited(obj, **kwargs):
+@serial.serializer(models.Author)
+def serialize_author(obj, **kwargs):
     """
-    Serialize a report in limited mode.
+    Serialize an author.
     """
-    # serialize_model, same as serialize_fields but with debugging information for models
-    limited_data = serial.serialize_model(obj, fields=("title", "message",))
-    return limited_data
+    return serial.serialize_model(obj, ("id", "name",))
+
+
+# register_compiled, same as serialize_model but generated into straight-line code once per (class, mode, fields)
+serialize_report_limited = serial.register_compiled(models.Report, ("title", "message",), mode="limited")
 
 
 @serial.serializer(models.Report, mode="full")
@@ -22,7 +24,7 @@ def serialize_report_full(obj, **kwargs):
     # Get limited data
     limited_data = serialize_report_limited(obj, **kwargs)
     # Add to it
-    full_data = serial.serialize_model(obj, ("status"))
+    full_data = serial.serialize_model(obj, ("status",))
     full_data.update(limited_data)
     # Return the full data
     return full_data
\ No newline at end of file
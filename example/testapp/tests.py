@@ -1,5 +1,10 @@
+from unittest import skipIf
+
 from django.test import TestCase, RequestFactory
 
+from djsonapi import profiling as _profiling
+from djsonapi import serial as _serial
+
 
 class TestAPI(TestCase):
     def test_exception(self):
@@ -11,6 +16,83 @@ class TestAPI(TestCase):
         response = api.exception(Exception(), debug=True, log_error=False)
         self.assertEqual(response.status_code, 500)
 
+    def test_error_log(self):
+        import logging
+        from djsonapi import api
+
+        records = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+
+        error_log = api.ErrorLog(interval=60)
+
+        def log_error(exc_class):
+            try:
+                raise exc_class("Failure")
+            except exc_class:
+                error_log.log("Returning internal server error")
+
+        handler = Handler()
+        api.log.addHandler(handler)
+        try:
+            for x in xrange(5):
+                log_error(ValueError)
+            log_error(KeyError)
+
+            # one traceback per kind of error
+            self.assertEqual([record.exc_info[0] for record in records], [ValueError, KeyError])
+            counts = sorted((count["exception"], count["count"]) for count in error_log.counts().values())
+            self.assertEqual(counts, [("KeyError", 1), ("ValueError", 5)])
+
+            # suppressed errors are summarized once per interval
+            error_log.summarized = 0
+            log_error(KeyError)
+            self.assertEqual(len(records), 3)
+            self.assertIn("ValueError x4", records[2].getMessage())
+            error_log.summarized = 0
+            log_error(KeyError)
+            self.assertEqual(len(records), 4)
+            self.assertIn("KeyError x1", records[3].getMessage())
+            self.assertNotIn("ValueError", records[3].getMessage())
+
+            # after the interval, the traceback is logged again with the number suppressed since reported
+            error_log.interval = 0
+            log_error(ValueError)
+            self.assertEqual(len(records), 5)
+            self.assertEqual(records[4].exc_info[0], ValueError)
+            self.assertNotIn("similar suppressed", records[4].getMessage())
+            error_log.interval = 60
+            log_error(ValueError)
+            error_log.interval = 0
+            log_error(ValueError)
+            self.assertEqual(len(records), 6)
+            self.assertIn("1 similar suppressed", records[5].getMessage())
+        finally:
+            api.log.removeHandler(handler)
+
+    def test_json_response_encoded(self):
+        from datetime import date
+        from djsonapi import api
+        from djsonapi import serial
+
+        encoded = serial.Encoded(serial.dumpb([{"title": u"caf\xe9"}]))
+        response = api.ok(message=u"r\xe9sum\xe9", reports=encoded, today=date(2014, 4, 9))
+        self.assertIsInstance(response.content, bytes)
+        self.assertIn(encoded.content, response.content)
+        self.assertEqual(serial.loads(response.content), {
+            "ok": True,
+            "message": u"r\xe9sum\xe9",
+            "body": {"reports": [{"title": u"caf\xe9"}], "today": "2014-04-09"},
+        })
+
+        # nested encoded values are decoded and encoded again
+        self.assertEqual(serial.loads(serial.dumps({"nested": encoded})), {"nested": [{"title": u"caf\xe9"}]})
+        if serial.msgpack is not None:
+            with serial.use_content_type(serial.MSGPACK_CONTENT_TYPE):
+                response = api.ok(reports=encoded)
+            self.assertEqual(serial.msgpack_loads(response.content)["body"]["reports"], [{"title": u"caf\xe9"}])
 
     def test_catch500(self):
         from djsonapi import api
@@ -340,6 +422,983 @@ class TestAPI(TestCase):
         self.assertEqual(response_data.get("message", not_found), not_found)
         self.assertEqual(response_data["body"]["data"], None)
 
+    @skipIf(_serial.msgpack is None, "msgpack is not installed")
+    def test_required_method_msgpack(self):
+        from datetime import date
+        from djsonapi import api
+        from djsonapi import serial
+
+        @api.required_method("POST")
+        def view(request, post=None):
+            return api.ok(post=post, today=date(2014, 4, 9))
+
+        data = {"test": 123}
+
+        factory = RequestFactory()
+        request = factory.post("/", content_type="application/msgpack", data=serial.msgpack_dumps(data),
+                               HTTP_ACCEPT="application/msgpack, application/json;q=0.9")
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-type"], "application/msgpack")
+        self.assertIn("Accept", response["Vary"])
+        response_data = serial.msgpack_loads(response.content)
+        self.assertEqual(response_data["ok"], True)
+        self.assertEqual(response_data["body"]["post"], data)
+        self.assertEqual(response_data["body"]["today"], "2014-04-09")
+
+        # JSON is still the default
+        request = factory.post("/", content_type="application/json", data=serial.dumps(data))
+        response = view(request)
+        self.assertEqual(response["Content-type"], "application/json; charset=utf-8")
+        self.assertEqual(serial.loads(response.content)["body"]["post"], data)
+
+    def test_post_form_lightweight(self):
+        from django import forms
+        from django.core.validators import MaxValueValidator
+        from example.testapp.forms import ReportForm
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        class ReportFieldsForm(forms.Form):
+            title = forms.CharField(max_length=100)
+            message = forms.CharField(required=False)
+            status = forms.IntegerField()
+
+        @api.required_method("POST")
+        @api.post_form(ReportFieldsForm, lightweight=True)
+        def view(request, form=None):
+            self.assertIsInstance(form, api.LightweightForm)
+            report = Report.objects.create(**form.cleaned_data)
+            return api.ok(pk=report.pk, title=form.cleaned_data["title"])
+
+        data = {"title": "light", "message": "weight", "status": 3}
+
+        factory = RequestFactory()
+        request = factory.post("/", content_type="application/json", data=serial.dumps(data))
+        response = view(request)
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_data["body"]["title"], "light")
+        self.assertEqual(Report.objects.get(pk=response_data["body"]["pk"]).status, 3)
+
+        ## Invalid
+
+        request = factory.post("/", content_type="application/json", data=serial.dumps({"status": "abc"}))
+        response = view(request)
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNotNone(response_data["body"]["errors"]["status"])
+
+        ## Model forms are fully validated, including model field validators
+
+        self.assertIsNone(api.compile_form_validator(ReportForm))
+
+        @api.required_method("POST")
+        @api.post_form(ReportForm, lightweight=True)
+        def model_view(request, form=None):
+            return api.ok(report_status=form.cleaned_data["status"])
+
+        request = factory.post("/", content_type="application/json", data=serial.dumps(dict(data, status=-1)))
+        response = model_view(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNotNone(serial.loads(response.content)["body"]["errors"]["status"])
+
+        ## Forms changing their fields in __init__ are fully constructed
+
+        class LimitedForm(ReportFieldsForm):
+            def __init__(self, *args, **kwargs):
+                super(LimitedForm, self).__init__(*args, **kwargs)
+                self.fields["status"].max_value = 10
+                self.fields["status"].validators.append(MaxValueValidator(10))
+
+        self.assertIsNone(api.compile_form_validator(LimitedForm))
+
+        ## The full form is checked before it is used
+
+        form = api.LightweightForm(LimitedForm, dict(data, status=99), dict(data, status=99))
+        with self.assertRaises(api.InvalidLightweightForm) as raised:
+            form.errors
+        self.assertIn("status", raised.exception.form.errors)
+
+    def test_post_form_patch(self):
+        from example.testapp.forms import ReportForm
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        report = Report.objects.create(title="before", message="message", status=1)
+
+        @api.required_method("PATCH")
+        @api.post_form(ReportForm, instance=lambda request, pk: Report.objects.filter(pk=pk).first())
+        def view(request, pk, form=None):
+            report = form.save()
+            return api.ok(report_status=report.status)
+
+        # a concurrent write to another column is not overwritten
+        Report.objects.filter(pk=report.pk).update(title="concurrent")
+
+        factory = RequestFactory()
+        request = factory.patch("/", content_type="application/json", data=serial.dumps({"status": 9}))
+        response = view(request, report.pk)
+        self.assertEqual(response.status_code, 200)
+        report = Report.objects.get(pk=report.pk)
+        self.assertEqual(report.status, 9)
+        self.assertEqual(report.title, "concurrent")
+        self.assertEqual(report.message, "message")
+
+        ## Invalid
+
+        request = factory.patch("/", content_type="application/json", data=serial.dumps({"status": "abc"}))
+        response = view(request, report.pk)
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response_data["body"]["errors"].keys()), ["status"])
+
+        ## Missing
+
+        request = factory.patch("/", content_type="application/json", data=serial.dumps({"status": 1}))
+        response = view(request, report.pk + 1000)
+        self.assertEqual(response.status_code, 404)
+
+    def test_merge_patch(self):
+        from djsonapi import api
+
+        target = {"a": "b", "c": {"d": "e", "f": "g"}}
+        patch = {"a": "z", "c": {"f": None, "h": [1]}}
+
+        self.assertEqual(api.merge_patch(target, patch), {"a": "z", "c": {"d": "e", "h": [1]}})
+        self.assertEqual(target, {"a": "b", "c": {"d": "e", "f": "g"}})
+        self.assertEqual(api.merge_patch(target, ["list"]), ["list"])
+        self.assertEqual(api.merge_patch("string", {"a": {"b": "c"}}), {"a": {"b": "c"}})
+
+    def test_compile_form_validator(self):
+        from django import forms
+        from djsonapi import api
+
+        class PlainForm(forms.Form):
+            field = forms.IntegerField()
+            flag = forms.BooleanField(required=False)
+
+        class HookForm(PlainForm):
+            def clean_field(self):
+                return self.cleaned_data["field"]
+
+        validate = api.compile_form_validator(PlainForm)
+        self.assertEqual(validate({"field": "12"}), {"field": 12, "flag": False})
+        self.assertIsNone(validate({"field": "abc"}))
+        self.assertIsNone(api.compile_form_validator(HookForm))
+        self.assertIsNone(api.compile_form_validator(lambda request, data: PlainForm(data=data)))
+
+    def test_required_method_read_replica(self):
+        from example.testapp.models import Report
+        from djsonapi import api
+
+        class User(object):
+            pk = 42
+
+            def is_authenticated(self):
+                return True
+
+        databases = []
+
+        @api.required_method("GET", "POST", read_replica="replica")
+        def view(request, post=None):
+            databases.append(Report.objects.all().db)
+            return api.ok()
+
+        factory = RequestFactory()
+
+        request = factory.get("/")
+        request.user = User()
+        view(request)
+        self.assertEqual(databases, ["replica"])
+        # reads outside of the view are not pinned
+        self.assertEqual(Report.objects.all().db, "default")
+
+        # the same user reads their own writes
+        request = factory.post("/", content_type="application/json", data="")
+        request.user = User()
+        view(request)
+        request = factory.get("/")
+        request.user = User()
+        view(request)
+        self.assertEqual(databases, ["replica", "default", "default"])
+
+        # writes through views that don't read from a replica are recorded too
+        class OtherUser(User):
+            pk = 43
+
+        @api.required_method("POST")
+        def write_view(request, post=None):
+            return api.ok()
+
+        request = factory.get("/")
+        request.user = OtherUser()
+        view(request)
+        request = factory.post("/", content_type="application/json", data="")
+        request.user = OtherUser()
+        write_view(request)
+        request = factory.get("/")
+        request.user = OtherUser()
+        view(request)
+        self.assertEqual(databases[3:], ["replica", "default"])
+
+    def test_replica_router_cache_warning(self):
+        import logging
+        from djsonapi import routers
+
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        handler = Handler()
+        routers.log.addHandler(handler)
+        try:
+            routers.ReplicaRouter()
+        finally:
+            routers.log.removeHandler(handler)
+        # the test settings use the per-process default cache
+        self.assertEqual(len(messages), 1)
+        self.assertIn("DJSONAPI_REPLICA_CACHE", messages[0])
+
+    def test_ok_list(self):
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        Report.objects.create(title="first", message="one", status=1)
+        Report.objects.create(title="second", message="two", status=2)
+        items = Report.objects.order_by("pk")
+
+        factory = RequestFactory()
+
+        response = api.ok_list(factory.get("/"), "reports", items, ("title", "status"), mode="limited")
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["title"] for item in response_data["body"]["reports"]], ["first", "second"])
+
+        response = api.ok_list(factory.get("/", {"format": "columnar"}), "reports", items, ("title", "status"))
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_data["body"]["reports"], {
+            "fields": ["title", "status"],
+            "rows": [["first", 1], ["second", 2]],
+        })
+
+    def test_ok_compound(self):
+        from example.testapp.models import Author, Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        first = Author.objects.create(name="first")
+        second = Author.objects.create(name="second")
+        for index in xrange(6):
+            Report.objects.create(title="r%d" % index, author=(first, second)[index % 2])
+        Report.objects.create(title="anonymous")
+
+        with self.assertNumQueries(2):
+            response = api.ok_compound("reports", Report.objects.order_by("pk"), mode="limited",
+                                       include={"author": None})
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+
+        reports = response_data["body"]["reports"]
+        self.assertEqual(len(reports), 7)
+        self.assertEqual(reports[0]["author"], first.pk)
+        self.assertEqual(reports[1]["author"], second.pk)
+        self.assertEqual(reports[6]["author"], None)
+
+        included = response_data["body"]["included"]["testapp.Author"]
+        self.assertEqual(sorted(included.keys()), sorted([str(first.pk), str(second.pk)]))
+        self.assertEqual(included[str(second.pk)]["name"], "second")
+
+    def test_changes_since(self):
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        first = Report.objects.create(title="first")
+        second = Report.objects.create(title="second")
+        factory = RequestFactory()
+
+        response = api.changes_since(Report.objects.all(), factory.get("/"), mode="limited")
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data["body"]["changes"]), 2)
+        self.assertEqual(response_data["body"]["deleted"], [])
+        watermark = response_data["body"]["watermark"]
+        self.assertTrue(watermark.endswith("Z"))
+        self.assertNotIn("+", watermark)
+
+        first.title = "changed"
+        first.save()
+        second_pk = second.pk
+        second.delete()
+        Report.objects.create(title="third")
+
+        response = api.changes_since(Report.objects.all(), factory.get("/?since=%s" % watermark), mode="limited")
+        response_data = serial.loads(response.content)
+        self.assertEqual(sorted(item["title"] for item in response_data["body"]["changes"]), ["changed", "third"])
+        self.assertEqual(response_data["body"]["deleted"], [str(second_pk)])
+        self.assertNotEqual(response_data["body"]["watermark"], watermark)
+
+        # rows written within the overlap are returned again
+        watermark = response_data["body"]["watermark"]
+        response = api.changes_since(Report.objects.all(), factory.get("/?since=%s" % watermark), mode="limited")
+        response_data = serial.loads(response.content)
+        self.assertEqual(sorted(item["title"] for item in response_data["body"]["changes"]), ["changed", "third"])
+        self.assertEqual(response_data["body"]["deleted"], [str(second_pk)])
+
+        response = api.changes_since(Report.objects.all(), factory.get("/"), mode="limited", overlap=0)
+        watermark = serial.loads(response.content)["body"]["watermark"]
+        response = api.changes_since(Report.objects.all(), factory.get("/?since=%s" % watermark), mode="limited")
+        self.assertEqual(serial.loads(response.content)["body"]["changes"], [])
+
+        response = api.changes_since(Report.objects.all(), factory.get("/", {"since": "yesterday"}))
+        self.assertEqual(response.status_code, 400)
+
+        # older watermarks with an offset, sent back unescaped
+        response = api.changes_since(Report.objects.all(), factory.get("/?since=2014-01-01T00:00:00+00:00"),
+                                     mode="limited")
+        self.assertEqual(response.status_code, 200)
+
+    def test_approximate_count(self):
+        from django.core.cache import cache
+        from example.testapp.models import Report
+        from djsonapi import api
+
+        cache.clear()
+        for index in xrange(5):
+            Report.objects.create(title="r%d" % index, status=index % 2)
+
+        self.assertEqual(api.approximate_count(Report.objects.all()), {"count": 5, "exact": True})
+        self.assertEqual(api.approximate_count(Report.objects.filter(status=1)), {"count": 2, "exact": True})
+
+        self.assertEqual(api.approximate_count(Report.objects.all(), threshold=3), {"count": 5, "exact": True})
+        Report.objects.create(title="new")
+        # above the threshold, the cached count is returned
+        with self.assertNumQueries(1):
+            self.assertEqual(api.approximate_count(Report.objects.all(), threshold=3), {"count": 5, "exact": False})
+        cache.clear()
+
+    def test_stream_ndjson(self):
+        from djsonapi import api
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        serial.register_compiled(Foop, ("flop",), mode="ndjson")
+
+        response = api.stream_ndjson([Foop(x) for x in xrange(5)], mode="ndjson", chunk_size=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-type"], api.NDJSON_CONTENT_TYPE)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        lines = "".join(chunks).splitlines()
+        self.assertEqual([serial.loads(line) for line in lines], [{"flop": x} for x in xrange(5)])
+
+    def test_stream_ndjson_error(self):
+        from djsonapi import api
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        @serial.serializer(Foop, mode="ndjson_error")
+        def serialize_foop(obj, **kwargs):
+            if obj.flop == 3:
+                raise Exception("Failure")
+            return {"flop": obj.flop}
+
+        response = api.stream_ndjson([Foop(x) for x in xrange(5)], mode="ndjson_error", log_error=False)
+        lines = "".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(serial.loads(lines[2]), {"flop": 2})
+        self.assertEqual(serial.loads(lines[3])["ok"], False)
+
+    def test_coalesce(self):
+        import threading
+        import time
+        from djsonapi import api
+        from djsonapi import serial
+
+        calls = []
+        entered = threading.Event()
+        release = threading.Event()
+
+        @api.coalesce()
+        def view(request):
+            calls.append(request)
+            entered.set()
+            release.wait(5)
+            return api.ok(count=len(calls))
+
+        factory = RequestFactory()
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(view(factory.get("/same/"))))
+                   for x in xrange(5)]
+        for thread in threads:
+            thread.start()
+        # let every thread reach the view or wait on the first one
+        entered.wait(5)
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(responses), 5)
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-type"], "application/json; charset=utf-8")
+            self.assertEqual(serial.loads(response.content)["body"]["count"], 1)
+
+        # not coalesced afterwards, nor for other methods
+        view(factory.get("/same/"))
+        view(factory.post("/same/"))
+        self.assertEqual(len(calls), 3)
+
+        # callers with different credentials are kept apart
+        self.assertNotEqual(api._coalesce_key(factory.get("/same/", HTTP_AUTHORIZATION="Token a")),
+                            api._coalesce_key(factory.get("/same/", HTTP_AUTHORIZATION="Token b")))
+
+    def test_stream_csv(self):
+        import csv
+        from datetime import date
+        from djsonapi import api
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        @serial.serializer(Foop, mode="csv")
+        def serialize_foop(obj, **kwargs):
+            return {"flop": obj.flop, "name": u"f\xf6\xf6p %d" % obj.flop, "day": date(2014, 4, obj.flop + 1)}
+
+        response = api.stream_csv([Foop(x) for x in xrange(5)], mode="csv", chunk_size=2, filename="foops.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-type"], api.CSV_CONTENT_TYPE)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="foops.csv"')
+        rows = list(csv.reader("".join(response.streaming_content).splitlines()))
+        self.assertEqual(rows[0], ["day", "flop", "name"])
+        self.assertEqual(rows[1], ["2014-04-01", "0", u"f\xf6\xf6p 0".encode("utf-8")])
+        self.assertEqual(len(rows), 6)
+
+        response = api.stream_csv([Foop(x) for x in xrange(2)], mode="csv", fields=("flop",))
+        self.assertEqual("".join(response.streaming_content).splitlines(), ["flop", "0", "1"])
+
+        response = api.stream_csv([], fields=("flop",))
+        self.assertEqual("".join(response.streaming_content).splitlines(), ["flop"])
+
+    def test_deferred(self):
+        import os
+        import shutil
+        import tempfile
+        from djsonapi import api
+        from djsonapi import jobs
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        serial.register_compiled(Foop, ("flop",), mode="deferred")
+
+        export_dir = jobs.EXPORT_DIR
+        jobs.EXPORT_DIR = tempfile.mkdtemp()
+        chunk_size = jobs.CHUNK_SIZE
+        jobs.CHUNK_SIZE = 2
+        try:
+            response = api.deferred([Foop(x) for x in xrange(5)], mode="deferred", backend=jobs.SyncBackend())
+            response_data = serial.loads(response.content)
+            self.assertEqual(response.status_code, 202)
+            job_id = response_data["body"]["job"]["id"]
+
+            factory = RequestFactory()
+            response = api.job_status(factory.get("/"), job_id)
+            response_data = serial.loads(response.content)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response_data["body"]["job"]["status"], jobs.DONE)
+            self.assertEqual(response_data["body"]["job"]["count"], 5)
+
+            response = api.job_download(factory.get("/"), job_id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(serial.loads("".join(response.streaming_content)), [{"flop": x} for x in xrange(5)])
+
+            self.assertEqual(api.job_status(factory.get("/"), "../../etc/passwd").status_code, 404)
+            self.assertEqual(api.job_download(factory.get("/"), "0" * 32).status_code, 404)
+
+            # finished jobs are pruned once they expire
+            self.assertEqual(jobs.prune_exports(max_age=60), 0)
+            self.assertEqual(jobs.prune_exports(max_age=-1), 1)
+            self.assertEqual(os.listdir(jobs.EXPORT_DIR), [])
+            self.assertEqual(api.job_status(factory.get("/"), job_id).status_code, 404)
+        finally:
+            shutil.rmtree(jobs.EXPORT_DIR)
+            jobs.EXPORT_DIR = export_dir
+            jobs.CHUNK_SIZE = chunk_size
+
+    def test_deferred_thread_backend(self):
+        import shutil
+        import tempfile
+        import time
+        from djsonapi import jobs
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        serial.register_compiled(Foop, ("flop",), mode="deferred")
+
+        export_dir = jobs.EXPORT_DIR
+        jobs.EXPORT_DIR = tempfile.mkdtemp()
+        try:
+            job_id = jobs.start_export([Foop(x) for x in xrange(3)], mode="deferred", backend=jobs.ThreadBackend(1))
+            for attempt in xrange(100):
+                if jobs.status(job_id)["status"] == jobs.DONE:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(jobs.status(job_id)["count"], 3)
+        finally:
+            shutil.rmtree(jobs.EXPORT_DIR)
+            jobs.EXPORT_DIR = export_dir
+
+    def test_batch(self):
+        from django.conf import settings
+        from django.contrib.auth.models import AnonymousUser
+        from django.core.exceptions import PermissionDenied
+        from django.core.urlresolvers import ResolverMatch
+        from django.http import Http404
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        calls = [
+            {"method": "GET", "path": "/api/"},
+            {"method": "POST", "path": "/api/report/", "body": {"title": "batched", "message": "hi", "status": 2}},
+            {"method": "GET", "path": "/api/report/"},
+            {"method": "GET", "path": "/api/missing/"},
+            {"method": "PUT", "path": "/api/"},
+        ]
+
+        factory = RequestFactory()
+        request = factory.post("/api/batch/", content_type="application/json", data=serial.dumps(calls),
+                               HTTP_X_CSRFTOKEN="token")
+        request.COOKIES[settings.CSRF_COOKIE_NAME] = "token"
+        request.user = AnonymousUser()
+        response = api.batch(request)
+        response_data = serial.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+
+        results = response_data["body"]["results"]
+        self.assertEqual([result["status"] for result in results], [200, 200, 200, 404, 405])
+        self.assertEqual(results[0]["message"], "Welcome")
+        self.assertEqual(results[1]["body"]["report"]["title"], "batched")
+        self.assertEqual(results[2]["body"]["latest_report"]["title"], "batched")
+        self.assertEqual(results[3]["ok"], False)
+        self.assertEqual(Report.objects.count(), 1)
+
+        request = factory.post("/api/batch/", content_type="application/json", data=serial.dumps({"path": "/"}))
+        self.assertEqual(api.batch(request).status_code, 400)
+
+        # Http404 and PermissionDenied raised by a view are not internal errors
+        def raising(exc):
+            def view(request):
+                raise exc
+            return view
+
+        resolve = api.resolve
+        try:
+            for exc, status in ((Http404("nope"), 404), (PermissionDenied(), 403)):
+                api.resolve = lambda path: ResolverMatch(raising(exc), (), {})
+                self.assertEqual(api._dispatch(request, "GET", "/api/", None)["status"], status)
+        finally:
+            api.resolve = resolve
+
+        # writes to views that aren't csrf_exempt need the CSRF token
+        request = factory.post("/api/batch/", content_type="text/plain", data=serial.dumps(calls[1:]))
+        request.user = AnonymousUser()
+        results = serial.loads(api.batch(request).content)["body"]["results"]
+        self.assertEqual([result["status"] for result in results], [200, 200, 404, 403])
+
+    def test_batch_parallel(self):
+        from djsonapi import api
+        from djsonapi import serial
+
+        batch = api.batch_view(max_requests=3, parallel=True)
+        factory = RequestFactory()
+
+        request = factory.post("/api/batch/", content_type="application/json",
+                               data=serial.dumps([{"path": "/api/"}] * 3))
+        response_data = serial.loads(batch(request).content)
+        self.assertEqual([result["message"] for result in response_data["body"]["results"]], ["Welcome"] * 3)
+
+        request = factory.post("/api/batch/", content_type="application/json",
+                               data=serial.dumps([{"path": "/api/"}] * 4))
+        self.assertEqual(batch(request).status_code, 400)
+
+    def test_limit_concurrency(self):
+        import threading
+        from djsonapi import api
+        from djsonapi import serial
+
+        entered = threading.Event()
+        release = threading.Event()
+
+        @api.limit_concurrency(max_inflight=1, queue_timeout=0.01, retry_after=3)
+        def view(request):
+            entered.set()
+            release.wait(5)
+            return api.ok()
+
+        factory = RequestFactory()
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(view(factory.get("/"))))
+        thread.start()
+        entered.wait(5)
+
+        response = view(factory.get("/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        response_data = serial.loads(response.content)
+        self.assertEqual(response_data["ok"], False)
+        self.assertEqual(response_data["message"], "Service Unavailable")
+
+        release.set()
+        thread.join()
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(view.gate.inflight, 0)
+        self.assertEqual(view(factory.get("/")).status_code, 200)
+
+        # each view has its own gate
+        limit = api.limit_concurrency(max_inflight=1)
+        self.assertIsNot(limit(lambda request: None).gate, limit(lambda request: None).gate)
+
+    @skipIf(_profiling.tracemalloc is None, "tracemalloc is not available")
+    def test_profile_memory(self):
+        from djsonapi import api
+        from djsonapi import profiling
+        from djsonapi import serial
+
+        class Foop(object):
+            def __init__(self, flop):
+                self.flop = flop
+
+        serial.register_compiled(Foop, ("flop",), mode="profile")
+        profiles = []
+
+        @profiling.profile_memory(sample_rate=2, callback=profiles.append)
+        def view(request):
+            items = [Foop(x) for x in range(1000)]
+            return api.ok(items=serial.serialize(items, mode="profile"))
+
+        factory = RequestFactory()
+        for x in range(3):
+            self.assertEqual(view(factory.get("/")).status_code, 200)
+
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual([phase["phase"] for phase in profiles[0].phases], ["view", "serialize", "encode"])
+        self.assertTrue(profiles[0].phases[1]["allocated"] > 0)
+
+    @skipIf(_profiling.resource is None, "resource is not available")
+    def test_profile_memory_rss(self):
+        from djsonapi import api
+        from djsonapi import profiling
+
+        profiles = []
+        original, profiling.tracemalloc = profiling.tracemalloc, None
+        try:
+            @profiling.profile_memory(sample_rate=1, callback=profiles.append)
+            def view(request):
+                profiling.mark("serialize")
+                return api.ok(items=["x" * 1000] * 100)
+
+            self.assertEqual(view(RequestFactory().get("/")).status_code, 200)
+        finally:
+            profiling.tracemalloc = original
+
+        phases = profiles[0].phases
+        self.assertEqual([phase["phase"] for phase in phases], ["view", "serialize", "encode"])
+        for phase in phases:
+            self.assertTrue(phase["allocated"] >= 0)
+            self.assertTrue(phase["peak"] > 0)
+            self.assertEqual(phase["top"], [])
+
+    def test_profile_memory_unavailable(self):
+        import logging
+        from djsonapi import profiling
+
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        def view(request):
+            pass
+
+        handler = Handler()
+        profiling.log.addHandler(handler)
+        originals = profiling.tracemalloc, profiling.resource, profiling._warned[:]
+        profiling.tracemalloc = profiling.resource = None
+        del profiling._warned[:]
+        try:
+            self.assertIs(profiling.profile_memory()(view), view)
+            self.assertIs(profiling.profile_memory()(view), view)
+        finally:
+            profiling.tracemalloc, profiling.resource, profiling._warned[:] = originals
+            profiling.log.removeHandler(handler)
+        self.assertEqual(len(messages), 1)
+
+    def test_profile_memory_phases(self):
+        from djsonapi import api
+        from djsonapi import profiling
+
+        class Stat(object):
+            def __init__(self, size_diff):
+                self.traceback = "serial.py:1"
+                self.size_diff = size_diff
+
+        class Snapshot(object):
+            def __init__(self, size):
+                self.size = size
+
+            def compare_to(self, other, key_type):
+                return [Stat(self.size - other.size)]
+
+        class FakeTracemalloc(object):
+            """
+            Stand-in for tracemalloc where every call to `get_traced_memory` allocates 100 bytes.
+            """
+
+            def __init__(self):
+                self.tracing = False
+                self.size = 0
+
+            def is_tracing(self):
+                return self.tracing
+
+            def start(self):
+                self.tracing = True
+
+            def stop(self):
+                self.tracing = False
+
+            def get_traced_memory(self):
+                self.size += 100
+                return self.size, self.size * 2
+
+            def take_snapshot(self):
+                return Snapshot(self.size)
+
+        fake = FakeTracemalloc()
+        original, profiling.tracemalloc = profiling.tracemalloc, fake
+        try:
+            profiles = []
+
+            @profiling.profile_memory(sample_rate=1, callback=profiles.append)
+            def view(request, fail=False):
+                profiling.mark("serialize")
+                if fail:
+                    raise ValueError("fail")
+                return api.ok()
+
+            self.assertEqual(view(RequestFactory().get("/")).status_code, 200)
+            with self.assertRaises(ValueError):
+                view(RequestFactory().get("/"), fail=True)
+        finally:
+            profiling.tracemalloc = original
+
+        self.assertEqual(len(profiles), 2)
+        phases = profiles[0].phases
+        self.assertEqual([phase["phase"] for phase in phases], ["view", "serialize", "encode"])
+        self.assertEqual([phase["allocated"] for phase in phases], [100, 100, 100])
+        self.assertEqual(phases[0]["top"], [("serial.py:1", 100)])
+        self.assertEqual([phase["phase"] for phase in profiles[1].phases], ["view", "serialize"])
+        self.assertIn("serialize: +100 bytes", profiles[0].summary())
+
+        # tracing is stopped, and the next request can be profiled
+        self.assertFalse(fake.tracing)
+        self.assertIsNone(profiling._state.profile)
+        self.assertTrue(profiling._profiling_lock.acquire(False))
+        profiling._profiling_lock.release()
+
+    def test_profiling_mark_inactive(self):
+        from djsonapi import profiling
+
+        profiling.mark("serialize")
+
+    def test_event_stream(self):
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import events
+        from djsonapi import serial
+
+        broker = events.Broker()
+        disconnect = events.publish_model_events(Report, mode="limited", channel="reports", broker=broker)
+        try:
+            factory = RequestFactory()
+            response = api.event_stream(factory.get("/"), ["reports"], heartbeat=0.01, broker=broker)
+            self.assertEqual(response["Content-type"], api.EVENT_STREAM_CONTENT_TYPE)
+            stream = iter(response.streaming_content)
+
+            self.assertEqual(next(stream), ": heartbeat\n\n")
+
+            report = Report.objects.create(title="live", message="event")
+            broker.publish("other", "ignored", {})
+            report.delete()
+
+            created = next(stream).splitlines()
+            self.assertEqual(created[:2], ["id: 1", "event: created"])
+            self.assertEqual(serial.loads(created[2][len("data: "):])["title"], "live")
+            self.assertEqual(next(stream).splitlines()[:2], ["id: 3", "event: deleted"])
+
+            response.close()
+            self.assertEqual(broker.subscriptions, set())
+
+            # closed before being read
+            api.event_stream(factory.head("/"), ["reports"], broker=broker).close()
+            self.assertEqual(broker.subscriptions, set())
+
+            # resume after the first event
+            response = api.event_stream(factory.get("/", HTTP_LAST_EVENT_ID="1"), ["reports"], broker=broker)
+            self.assertTrue(next(iter(response.streaming_content)).startswith("id: 3\n"))
+            response.close()
+        finally:
+            disconnect()
+
+    def test_subscription_bounded(self):
+        from djsonapi import events
+
+        broker = events.Broker(queue_size=2)
+        subscription = broker.subscribe(["channel"])
+        for x in xrange(5):
+            broker.publish("channel", "event", x)
+        self.assertEqual(subscription.dropped, 3)
+        self.assertEqual([subscription.get(0)[3], subscription.get(0)[3]], ["3", "4"])
+        self.assertIsNone(subscription.get(0))
+
+    def test_aggregate(self):
+        from django.db.models import Count, Sum
+        from example.testapp.models import Author, Report
+        from djsonapi import api
+        from djsonapi import serial
+
+        author = Author.objects.create(name="writer")
+        Report.objects.create(status=1, author=author)
+        Report.objects.create(status=1)
+        Report.objects.create(status=5, author=author)
+        factory = RequestFactory()
+        metrics = {"count": Count("pk"), "total": Sum("status")}
+
+        def aggregate(path):
+            response = api.aggregate(Report.objects.all(), factory.get(path), ["status", "author"], metrics)
+            content = serial.loads(response.content)
+            return response.status_code, content.get("body", content)
+
+        status, content = aggregate("/?group_by=status")
+        self.assertEqual(status, 200)
+        self.assertEqual(content["groups"], {"fields": ["status", "count", "total"],
+                                             "rows": [[1, 2, 2], [5, 1, 5]]})
+
+        status, content = aggregate("/?group_by=status,author&metrics=count")
+        self.assertEqual(content["groups"]["fields"], ["status", "author", "count"])
+        self.assertEqual(len(content["groups"]["rows"]), 3)
+
+        status, content = aggregate("/?metrics=total")
+        self.assertEqual(content["groups"], {"fields": ["total"], "rows": [[7]]})
+
+        status, content = aggregate("/?group_by=title")
+        self.assertEqual(status, 400)
+        self.assertEqual(content["dimensions"], ["title"])
+        status, content = aggregate("/?metrics=average")
+        self.assertEqual(status, 400)
+        self.assertEqual(content["metrics"], ["average"])
+
+    def test_filter_query(self):
+        from django import forms
+        from example.testapp.models import Report
+        from djsonapi import api
+        from djsonapi import filters
+        from djsonapi import serial
+
+        class ReportFilters(filters.FilterSet):
+            status = filters.Filter(forms.IntegerField())
+            status__gte = filters.Filter(forms.IntegerField())
+            title = filters.Filter(forms.CharField(), lookup="title__icontains")
+            ordering = ("title", "pk")
+
+        @api.filter_query(ReportFilters)
+        def reports(request, filters):
+            return api.ok(titles=list(filters.filter(Report.objects.all()).values_list("title", flat=True)))
+
+        Report.objects.create(title="Alpha", status=1)
+        Report.objects.create(title="beta", status=2)
+        Report.objects.create(title="alphabet", status=3)
+        factory = RequestFactory()
+
+        def titles(path):
+            response = reports(factory.get(path))
+            return response.status_code, serial.loads(response.content).get("body")
+
+        self.assertEqual(titles("/?title=alpha&ordering=-title"), (200, {"titles": ["alphabet", "Alpha"]}))
+        self.assertEqual(titles("/?status__gte=2&ordering=pk"), (200, {"titles": ["beta", "alphabet"]}))
+        self.assertEqual(titles("/?status=3"), (200, {"titles": ["alphabet"]}))
+        self.assertEqual(titles("/?status=&ordering=pk"), (200, {"titles": ["Alpha", "beta", "alphabet"]}))
+
+        status, body = titles("/?status=high&ordering=message")
+        self.assertEqual(status, 400)
+        self.assertEqual(sorted(body["errors"]), ["ordering", "status"])
+
+        # other methods are passed through
+        @api.filter_query(ReportFilters)
+        def create(request, filters=None):
+            return api.ok(filtered=filters is not None)
+
+        response = create(factory.post("/?status=high"))
+        self.assertEqual(serial.loads(response.content)["body"], {"filtered": False})
+
+    def test_filter_indexes(self):
+        import logging
+        from django import forms
+        from example.testapp.models import Report
+        from djsonapi import filters
+
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        self.assertTrue(filters.is_indexed(Report, "pk"))
+        self.assertTrue(filters.is_indexed(Report, "author"))
+        self.assertTrue(filters.is_indexed(Report, "author__id__in"))
+        self.assertFalse(filters.is_indexed(Report, "status__gte"))
+        self.assertFalse(filters.is_indexed(Report, "author__name"))
+
+        class StatusFilters(filters.FilterSet):
+            status = filters.Filter(forms.IntegerField())
+            ordering = ("pk",)
+
+        handler = Handler()
+        filters.log.addHandler(handler)
+        try:
+            with self.settings(DEBUG=True):
+                StatusFilters({}).filter(Report.objects.all())
+                StatusFilters({}).filter(Report.objects.all())
+        finally:
+            filters.log.removeHandler(handler)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("'status'", messages[0])
+
 
 class TestSerialization(TestCase):
     def test_datetimeserializes(self):
@@ -562,8 +1621,258 @@ class TestSerialization(TestCase):
         self.assertEqual(data["whiz"], "bang")
         self.assertEqual(data["bang"], "boom")
 
+    def test_compile_serializer(self):
+        from djsonapi import serial
+
+        class Foop(object):
+            flim = "flam"
+
+            def __init__(self):
+                self.flop = "flap"
+                self.flup = lambda: "flep"
+
+            def foof(self):
+                return "foop!"
+
+        fields = ("flim", "flop", "flup", "foof")
+        func = serial.compile_serializer(Foop, fields)
+
+        self.assertEqual(func(Foop()), serial.serialize_fields(Foop(), fields))
+        self.assertIs(func, serial.compile_serializer(Foop, fields))
+
+    def test_compile_serializer_model(self):
+        from example.testapp.models import Report
+        from djsonapi import serial
+
+        m = Report(title="YES", message="It Worked!", status=1)
+        m.save()
+
+        for debug_fields in (True, False):
+            for fields in (None, ("message",)):
+                func = serial.compile_serializer(Report, fields, debug_fields=debug_fields)
+                self.assertEqual(func(m), serial.serialize_model(m, fields, debug_fields=debug_fields))
+
+    def test_register_compiled(self):
+        from djsonapi import serial
+
+        class Foop(object):
+            flim = "flam"
+
+        serial.register_compiled(Foop, ("flim",), mode="compiled")
+
+        self.assertEqual(serial.serialize(Foop(), mode="compiled"), {"flim": "flam"})
+
+    def test_serialize_columns(self):
+        from djsonapi import serial
+
+        class Foop(object):
+            flim = "flam"
+
+            def __init__(self, flop):
+                self.flop = flop
+
+            def foof(self):
+                return "foop!"
+
+        data = serial.serialize_columns([Foop(1), Foop(2)], ("flim", "flop", "foof"))
+
+        self.assertEqual(data["fields"], ("flim", "flop", "foof"))
+        self.assertEqual(data["rows"], [("flam", 1, "foop!"), ("flam", 2, "foop!")])
+
+    def test_serialize_columns_models(self):
+        from django.core.exceptions import FieldError
+        from example.testapp.models import Author, Report
+        from djsonapi import serial
+
+        author = Author.objects.create(name="writer")
+        Report.objects.create(title="first", author=author)
+        Report.objects.create(title="second")
+
+        queryset = Report.objects.order_by("pk")
+        fields = ("pk", "title", "author")
+        data = serial.serialize_columns(queryset, fields)
+        self.assertEqual(serial.serialize_columns(list(queryset), fields), data)
+        self.assertEqual([row[2] for row in data["rows"]], [author.pk, None])
+        serial.dumps(data)
+
+        for items in (queryset, list(queryset)):
+            with self.assertRaises(FieldError):
+                serial.serialize_columns(items, ("title", "author__name"))
+
+    @skipIf(_serial.cbor2 is None, "cbor2 is not installed")
+    def test_cbor(self):
+        from datetime import date, datetime
+        from decimal import Decimal
+        from djsonapi import serial
+
+        data = {"day": date(2014, 4, 9), "at": datetime(2014, 4, 9, 12, 30), "price": Decimal("1.50"),
+                "items": [1, u"caf\xe9", None]}
+        self.assertEqual(serial.cbor_loads(serial.cbor_dumps(data)), serial.loads(serial.dumps(data)))
+        self.assertEqual(serial.cbor_loads(serial.dumps_as(serial.CBOR_CONTENT_TYPE, data))["day"], "2014-04-09")
+
+    def test_negotiate(self):
+        from djsonapi import serial
+
+        self.assertEqual(serial.negotiate(None), serial.JSON_CONTENT_TYPE)
+        self.assertEqual(serial.negotiate("text/html, */*"), serial.JSON_CONTENT_TYPE)
+        self.assertEqual(serial.negotiate("application/json, application/msgpack"), serial.JSON_CONTENT_TYPE)
+        if serial.msgpack is not None:
+            self.assertEqual(serial.negotiate("application/msgpack; q=1"), serial.MSGPACK_CONTENT_TYPE)
+            self.assertEqual(serial.negotiate("application/msgpack;q=0, application/json"), serial.JSON_CONTENT_TYPE)
+            self.assertEqual(serial.negotiate("application/json;q=0.1, application/msgpack"),
+                             serial.MSGPACK_CONTENT_TYPE)
+            self.assertEqual(serial.negotiate("application/json;q=0.5, application/msgpack;q=0.5"),
+                             serial.JSON_CONTENT_TYPE)
+
+    def test_serial_context(self):
+        from djsonapi import serial
+
+        calls = []
+
+        class Foop(object):
+            def __init__(self, pk):
+                self.pk = pk
+
+        class Bar(object):
+            def __init__(self, foop):
+                self.foop = foop
+
+        @serial.serializer(Foop, mode="context")
+        def serialize_foop(obj, **kwargs):
+            calls.append(obj.pk)
+            return {"pk": obj.pk}
+
+        @serial.serializer(Bar, mode="context")
+        def serialize_bar(obj, context=None, **kwargs):
+            return {
+                "foop": serial.serialize(obj.foop, mode="context", context=context),
+                "even": context.memo(("even", obj.foop.pk), lambda: obj.foop.pk % 2 == 0),
+            }
+
+        foops = [Foop(1), Foop(2)]
+        context = serial.SerialContext()
+        data = serial.serialize([Bar(foops[x % 2]) for x in xrange(10)], mode="context", context=context)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(data[2], {"foop": {"pk": 1}, "even": False})
+        self.assertEqual(data[3], {"foop": {"pk": 2}, "even": True})
+
+        # mutating a repeated result does not change the identity map
+        data[2]["foop"]["pk"] = 3
+        self.assertEqual(serial.serialize(foops[0], mode="context", context=context), {"pk": 1})
+        self.assertEqual(calls, [1, 2])
+
+        # serializer kwargs are part of the identity
+        serial.serialize(foops[0], mode="context", context=context, extra=1)
+        self.assertEqual(calls, [1, 2, 1])
+
+        # without a context, nothing is shared
+        serial.serialize(foops * 2, mode="context")
+        self.assertEqual(calls, [1, 2, 1, 1, 2, 1, 2])
+
+    def test_serial_context_for_request(self):
+        from djsonapi import serial
+
+        request = RequestFactory().get("/")
+        context = serial.SerialContext.for_request(request)
+        self.assertIs(context, serial.SerialContext.for_request(request))
+        self.assertIsNone(context.identity)
+
+    def test_register_encoder(self):
+        from decimal import Decimal
+        from example.testapp.models import Report
+        from djsonapi import serial
 
+        class Money(Decimal):
+            pass
+
+        class Point(object):
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        serial.register_encoder(Point, lambda point: [point.x, point.y])
+        try:
+            self.assertEqual(serial.loads(serial.dumps({"point": Point(1, 2)})), {"point": [1, 2]})
+            # unregistered types still use Django"s encoder
+            self.assertEqual(serial.loads(serial.dumps({"money": Money("1.50")})), {"money": "1.50"})
+
+            serial.register_encoder(Decimal, float)
+            self.assertEqual(serial.loads(serial.dumps({"money": Money("1.50")})), {"money": 1.5})
+
+            serial.register_encoder(Report, lambda report: serial.serialize(report, mode="limited"))
+            report = Report(title="YES", message="It Worked!")
+            data = serial.loads(serial.dumps([report]))
+            self.assertEqual(data[0]["title"], "YES")
+            self.assertEqual(data[0]["message"], "It Worked!")
+        finally:
+            for klass in (Point, Decimal, Report):
+                serial.ENCODER_MAP.pop(klass, None)
+            serial._encoder_cache.clear()
+
+    def test_vectorized(self):
+        from example.testapp.models import Report
+        from djsonapi import serial
 
+        for index in xrange(5):
+            Report.objects.create(title="r%d" % index, status=index)
+
+        serial.vectorized(Report, ("title", "status"), {
+            "double": lambda columns: columns["status"] * 2,
+            "ratio": lambda columns: columns["status"] / 4.0,
+            "half": lambda columns: columns["status"] / 2,
+            "constant": lambda columns: 1,
+        }, mode="vectorized", chunk_size=2)
+
+        queryset = Report.objects.order_by("pk")
+        with self.assertNumQueries(1):
+            data = serial.serialize(queryset, mode="vectorized")
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[3], {"title": "r3", "status": 3, "double": 6, "ratio": 0.75, "half": 3 / 2,
+                                   "constant": 1})
+        self.assertEqual(list(serial.iserialize(queryset, mode="vectorized")), data)
+
+        # single instances use the same computed fields
+        self.assertEqual(serial.serialize(queryset[3], mode="vectorized"), data[3])
+
+        # the same without NumPy
+        numpy = serial.numpy
+        serial.numpy = None
+        try:
+            self.assertEqual(serial.serialize(queryset, mode="vectorized"), data)
+        finally:
+            serial.numpy = numpy
+
+    def test_vectorized_nulls(self):
+        from example.testapp.models import Author, Report
+        from djsonapi import serial
 
+        author = Author.objects.create(name="writer")
+        Report.objects.create(status=1, author=author)
+        Report.objects.create(status=2)
 
+        serial.vectorized(Report, ("status", "author"), {
+            "total": lambda columns: columns["status"] + columns["author"],
+        }, mode="vectorized_nulls")
+
+        numpy = serial.numpy
+        try:
+            for serial.numpy in (numpy, None):
+                data = serial.serialize(Report.objects.order_by("pk"), mode="vectorized_nulls")
+                self.assertEqual(data, [{"status": 1, "author": author.pk, "total": 1 + author.pk},
+                                        {"status": 2, "author": None, "total": None}])
+                data = serial.serialize(Report.objects.filter(author=None), mode="vectorized_nulls")
+                self.assertEqual(data, [{"status": 2, "author": None, "total": None}])
+        finally:
+            serial.numpy = numpy
+
+    def test_column(self):
+        from djsonapi import serial
 
+        column = serial.Column([1, 2, 4])
+        self.assertEqual(column * 2 + serial.Column([3, 4, 5]), [5, 8, 13])
+        self.assertEqual(1 - column, [0, -1, -3])
+        self.assertEqual(column / 2.0, [0.5, 1.0, 2.0])
+        self.assertEqual(column / 2, [value / 2 for value in [1, 2, 4]])
+        self.assertEqual(column // 2, [0, 1, 2])
+        self.assertEqual(-column, [-1, -2, -4])
@@ -0,0 +1,12 @@
+from django.conf.urls import patterns, url
+from django.views.decorators.csrf import csrf_exempt
+
+from djsonapi import api
+
+from example.testapp import views
+
+urlpatterns = patterns('',
+    url(r'^$', views.home, name='home'),
+    url(r'^report/$', csrf_exempt(views.report), name='report'),
+    url(r'^batch/$', csrf_exempt(api.batch), name='batch'),
+)
@@ -14,7 +14,7 @@ def home(request):
 
 
 @api.required_method("GET", "POST")
-@api.post_form(forms.ModelForm)
+@api.post_form(forms.ReportForm)
 def report(request, form=None):
     # Choose the mode we're going to return report data back as
     mode = "full" if request.user.is_staff else "limited"
@@ -31,11 +31,11 @@ def report(request, form=None):
         # return the latest report
         try:
             # get the instance
-            lastest_report = models.TestModel.objects.order_by("-pk").get()
+            lastest_report = models.Report.objects.latest("pk")
             # serialize it using the appropriate mode (turn into python dict)
             lastest_report_data = serial.serialize(lastest_report, mode=mode)
             # return response as json
             return api.ok(latest_report=lastest_report_data)
-        except models.TestModel.DoesNotExist:
+        except models.Report.DoesNotExist:
             # latest report not found
             return api.error404()
\ No newline at end of file